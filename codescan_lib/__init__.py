@@ -28,8 +28,8 @@ from .utils import (
 )
 
 from .analyzer import CodeAnalyzer
-from .db_operations import clear_database, get_db_session, close_db_connection, print_db_info
-from .analysis import analyze_file, analyze_directory
+from .db_operations import clear_database, ensure_indexes, get_db_session, close_db_connection, print_db_info
+from .analysis import analyze_file, analyze_source, analyze_directory, analyze_directory_bulk
 
 __all__ = [
     # Constants
@@ -44,8 +44,8 @@ __all__ = [
     'CodeAnalyzer',
 
     # Database operations
-    'clear_database', 'get_db_session', 'close_db_connection', 'print_db_info',
+    'clear_database', 'ensure_indexes', 'get_db_session', 'close_db_connection', 'print_db_info',
 
     # Analysis functions
-    'analyze_file', 'analyze_directory'
+    'analyze_file', 'analyze_source', 'analyze_directory', 'analyze_directory_bulk'
 ]
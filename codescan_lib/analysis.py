@@ -1,15 +1,33 @@
 import os
 import ast
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from tqdm import tqdm
 
 from .constants import IGNORE_DIRS
 from .utils import is_test_file, is_example_file, is_project_file, get_relative_path
-from .analyzer import CodeAnalyzer
+from .analyzer import CodeAnalyzer, load_reference_names
 from .stats_collector import StatsCollector
 
+def read_and_parse(file_path: str) -> Tuple[str, ast.Module]:
+    """
+    Read a Python file once and parse it.
+
+    Args:
+        file_path: Path to the file to read
+
+    Returns:
+        Tuple of the decoded source and its AST
+
+    Raises:
+        UnicodeDecodeError: If the file is not valid UTF-8
+        SyntaxError: If the source cannot be parsed
+    """
+    with open(file_path, "rb") as f:
+        source = f.read().decode("utf-8")
+    return source, ast.parse(source, filename=file_path)
+
 def analyze_file(file_path: str, session, base_dir: str, stats_collector: Optional[StatsCollector] = None,
-                custom_patterns: Optional[Dict[str, Any]] = None) -> None:
+                custom_patterns: Optional[Dict[str, Any]] = None, extra_label: Optional[str] = None) -> None:
     """
     Analyze a single Python file and add its content to the graph database.
 
@@ -19,7 +37,42 @@ def analyze_file(file_path: str, session, base_dir: str, stats_collector: Option
         base_dir: Base directory of the project for relative path computation
         stats_collector: Statistics collector to use
         custom_patterns: Dictionary with custom test detection patterns
+        extra_label: Optional additional label put on every node created for this file
+
+    Definitions only replace reference nodes known to this process; call
+    load_reference_names() first when the graph already holds nodes written
+    by another process.
     """
+    _analyze(file_path, session, base_dir, lambda: read_and_parse(file_path)[1],
+             stats_collector, custom_patterns, extra_label)
+
+def analyze_source(source: str, file_path: str, session, base_dir: str,
+                   stats_collector: Optional[StatsCollector] = None,
+                   custom_patterns: Optional[Dict[str, Any]] = None, extra_label: Optional[str] = None) -> None:
+    """
+    Analyze Python source held in memory and add its content to the graph database.
+
+    The source is stored as if it had been read from file_path, so test and
+    example detection work the same as for analyze_file, but nothing is read
+    from disk.
+
+    Args:
+        source: Python source code to analyze
+        file_path: Path the source is stored under; relative paths are taken relative to base_dir
+        session: Neo4j database session
+        base_dir: Base directory of the project for relative path computation
+        stats_collector: Statistics collector to use
+        custom_patterns: Dictionary with custom test detection patterns
+        extra_label: Optional additional label put on every node created for this source
+    """
+    file_path = os.path.join(base_dir, file_path)
+    _analyze(file_path, session, base_dir, lambda: ast.parse(source, filename=file_path),
+             stats_collector, custom_patterns, extra_label)
+
+def _analyze(file_path: str, session, base_dir: str, parse: Callable[[], ast.Module],
+             stats_collector: Optional[StatsCollector] = None,
+             custom_patterns: Optional[Dict[str, Any]] = None, extra_label: Optional[str] = None) -> None:
+    """Shared implementation of analyze_file and analyze_source; parse() returns the module's AST."""
     # Use provided stats collector or create a new one
     stats = stats_collector if stats_collector is not None else StatsCollector()
 
@@ -46,6 +99,8 @@ def analyze_file(file_path: str, session, base_dir: str, stats_collector: Option
         file_labels += ":TestFile"
     elif is_example_flag:
         file_labels += ":ExampleFile"
+    if extra_label:
+        file_labels += f":`{extra_label}`"
 
     # Create the File node with appropriate labels
     session.run(
@@ -64,49 +119,50 @@ def analyze_file(file_path: str, session, base_dir: str, stats_collector: Option
     )
 
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            tree = ast.parse(f.read(), filename=file_path)
-            # Pass the test file flag and stats collector to CodeAnalyzer
-            analyzer = CodeAnalyzer(rel_path, session, is_test_file=is_test_flag, stats_collector=stats)
-            analyzer.visit(tree)
-
-            # Process test relationships if this is a test file
-            if is_test_flag:
-                analyzer.process_test_relationships(custom_patterns)
-
-            # After analyzing the file, create relationships between the File node and its contents
-            # Link File to its Classes
-            session.run(
-                """
-                MATCH (f:File {path: $path})
-                MATCH (c:Class {file: $path})
-                MERGE (f)-[:CONTAINS {color: "#2196F3"}]->(c)
-                """,
-                path=rel_path
-            )
-
-            # Link File to its Functions (that aren't in classes)
-            session.run(
-                """
-                MATCH (f:File {path: $path})
-                MATCH (func:Function {file: $path})
-                WHERE NOT EXISTS {
-                  MATCH (c:Class)-[:CONTAINS]->(func)
-                }
-                MERGE (f)-[:CONTAINS {color: "#2196F3"}]->(func)
-                """,
-                path=rel_path
-            )
-
-            # Link File to its Constants (that aren't in classes or functions)
-            session.run(
-                """
-                MATCH (f:File {path: $path})
-                MATCH (const:Constant {file: $path, scope: 'module'})
-                MERGE (f)-[:CONTAINS {color: "#2196F3"}]->(const)
-                """,
-                path=rel_path
-            )
+        tree = parse()
+        # Pass the file type flags and stats collector to CodeAnalyzer
+        analyzer = CodeAnalyzer(rel_path, session, is_test_file=is_test_flag,
+                                stats_collector=stats, is_example_file=is_example_flag,
+                                extra_label=extra_label)
+        analyzer.visit(tree)
+
+        # Process test relationships if this is a test file
+        if is_test_flag:
+            analyzer.process_test_relationships(custom_patterns)
+
+        # After analyzing the file, create relationships between the File node and its contents
+        # Link File to its Classes
+        session.run(
+            """
+            MATCH (f:File {path: $path})
+            MATCH (c:Class {file: $path})
+            MERGE (f)-[:CONTAINS {color: "#2196F3"}]->(c)
+            """,
+            path=rel_path
+        )
+
+        # Link File to its Functions (that aren't in classes)
+        session.run(
+            """
+            MATCH (f:File {path: $path})
+            MATCH (func:Function {file: $path})
+            WHERE NOT EXISTS {
+              MATCH (c:Class)-[:CONTAINS]->(func)
+            }
+            MERGE (f)-[:CONTAINS {color: "#2196F3"}]->(func)
+            """,
+            path=rel_path
+        )
+
+        # Link File to its Constants (that aren't in classes or functions)
+        session.run(
+            """
+            MATCH (f:File {path: $path})
+            MATCH (const:Constant {file: $path, scope: 'module'})
+            MERGE (f)-[:CONTAINS {color: "#2196F3"}]->(const)
+            """,
+            path=rel_path
+        )
 
     except SyntaxError as e:
         stats.register_file_error(rel_path, "SyntaxError", str(e))
@@ -114,7 +170,8 @@ def analyze_file(file_path: str, session, base_dir: str, stats_collector: Option
         stats.register_file_error(rel_path, "UnicodeDecodeError", "Unable to decode file")
 
 def analyze_directory(directory: str, session, ignore_dirs: Optional[List[str]] = None,
-                    custom_patterns: Optional[Dict[str, Any]] = None, verbose: bool = False) -> StatsCollector:
+                    custom_patterns: Optional[Dict[str, Any]] = None, verbose: bool = False,
+                    extra_label: Optional[str] = None) -> StatsCollector:
     """
     Recursively analyze all Python files in a directory and its subdirectories.
 
@@ -124,6 +181,7 @@ def analyze_directory(directory: str, session, ignore_dirs: Optional[List[str]]
         ignore_dirs: List of directory names to ignore (defaults to IGNORE_DIRS)
         custom_patterns: Dictionary with custom test detection patterns
         verbose: Whether to print verbose output during scanning
+        extra_label: Optional additional label put on every node created by the scan
 
     Returns:
         Statistics collector with information about the analysis
@@ -134,6 +192,9 @@ def analyze_directory(directory: str, session, ignore_dirs: Optional[List[str]]
     # Create a stats collector
     stats = StatsCollector(verbose=verbose)
 
+    # Pick up reference nodes left by earlier scans into the same graph
+    load_reference_names(session)
+
     # Store the base directory to identify project files
     base_dir = os.path.abspath(directory)
 
@@ -153,8 +214,35 @@ def analyze_directory(directory: str, session, ignore_dirs: Optional[List[str]]
             for file in files:
                 if file.endswith(".py"):
                     full_path = os.path.join(root, file)
-                    analyze_file(full_path, session, base_dir, stats, custom_patterns)
+                    analyze_file(full_path, session, base_dir, stats, custom_patterns, extra_label)
                     pbar.update(1)
 
     # Return the stats collector for the caller to use
     return stats
+
+def analyze_directory_bulk(directory: str, session, ignore_dirs: Optional[List[str]] = None,
+                           custom_patterns: Optional[Dict[str, Any]] = None, verbose: bool = False,
+                           extra_label: Optional[str] = None) -> StatsCollector:
+    """
+    Analyze a directory like analyze_directory, but in a single explicit transaction.
+
+    Every statement runs in one transaction that is committed at the end,
+    instead of one auto-commit transaction per statement. This suits small
+    and medium projects; very large ones may exceed the server's transaction
+    memory limits and should use analyze_directory.
+
+    Args:
+        directory: Directory to scan
+        session: Neo4j database session
+        ignore_dirs: List of directory names to ignore (defaults to IGNORE_DIRS)
+        custom_patterns: Dictionary with custom test detection patterns
+        verbose: Whether to print verbose output during scanning
+        extra_label: Optional additional label put on every node created by the scan
+
+    Returns:
+        Statistics collector with information about the analysis
+    """
+    with session.begin_transaction() as tx:
+        stats = analyze_directory(directory, tx, ignore_dirs, custom_patterns, verbose, extra_label)
+        tx.commit()
+    return stats
@@ -3,19 +3,66 @@ from .constants import BUILTIN_FUNCTIONS, TEST_FUNCTION_PREFIXES
 from .utils import is_stdlib_module
 from .stats_collector import StatsCollector
 
+# Names of functions for which a ReferenceFunction node has been created.
+# Shared across analyzers so definitions in later files can skip the
+# reference lookup when no call to them has been seen yet. Reference nodes
+# written by an earlier process are only known after load_reference_names().
+_reference_names = set()
+
+def reset_reference_names():
+    """Forget all reference names, e.g. after the database was cleared."""
+    _reference_names.clear()
+
+def load_reference_names(session):
+    """Add the names of ReferenceFunction nodes already in the graph."""
+    result = session.run("MATCH (f:ReferenceFunction) RETURN f.name AS name")
+    _reference_names.update(record["name"] for record in result)
+
 class CodeAnalyzer(ast.NodeVisitor):
-    def __init__(self, file_path, session, is_test_file=False, stats_collector=None):
+    """
+    AST visitor writing one module's classes, functions, calls and constants to the graph.
+
+    A definition only replaces a ReferenceFunction node whose name is in the
+    process-wide reference set. When analyzing into a graph that already holds
+    reference nodes from another process, call load_reference_names() first;
+    analyze_directory does this once per scan.
+    """
+    def __init__(self, file_path, session, is_test_file=False, stats_collector=None, is_example_file=None,
+                 extra_label=None):
         self.file_path = file_path
         self.session = session
         self.current_class = None
         self.current_function = None
         self.is_test_file = is_test_file
-        self.is_example_file = self._is_example_file(file_path)
+        # Callers that already classified the file can pass the flag along
+        self.is_example_file = self._is_example_file(file_path) if is_example_file is None else is_example_file
         self.current_scope = "module"  # Track current scope for constants
+        # Additional label put on every node this analyzer creates
+        self.extra_labels = f":`{extra_label}`" if extra_label else ""
+        # (class_name, function_name) pairs written by flush()
+        self.contains = []
+        # Constant rows written by flush()
+        self.constants = []
+        # Node type -> bound visit method, filled lazily by visit()
+        self._visitors = {}
 
         # Use provided stats collector or create a new one
         self.stats = stats_collector if stats_collector is not None else StatsCollector()
 
+    def visit(self, node):
+        """Dispatch to the visit_* method for the node type, caching the lookup."""
+        node_type = type(node)
+        visitor = self._visitors.get(node_type)
+        if visitor is None:
+            visitor = getattr(self, 'visit_' + node_type.__name__, self.generic_visit)
+            self._visitors[node_type] = visitor
+        return visitor(node)
+
+    def generic_visit(self, node):
+        """Visit all child nodes."""
+        for child in ast.iter_child_nodes(node):
+            self.visit(child)
+
     def _is_example_file(self, file_path):
         """
         Local method to check if a file is an example file.
@@ -48,29 +95,19 @@ class CodeAnalyzer(ast.NodeVisitor):
 
         # Choose appropriate labels based on file type
         if self.is_test_file:
-            self.session.run(
-                "MERGE (c:Class:Test:TestClass {name: $name, file: $file, line: $line, end_line: $end_line})",
-                name=class_name,
-                file=self.file_path,
-                line=line_num,
-                end_line=getattr(node, 'end_lineno', -1)
-            )
+            labels = ":Class:Test:TestClass"
         elif self.is_example_file:
-            self.session.run(
-                "MERGE (c:Class:Example:ExampleClass {name: $name, file: $file, line: $line, end_line: $end_line})",
-                name=class_name,
-                file=self.file_path,
-                line=line_num,
-                end_line=getattr(node, 'end_lineno', -1)
-            )
+            labels = ":Class:Example:ExampleClass"
         else:
-            self.session.run(
-                "MERGE (c:Class {name: $name, file: $file, line: $line, end_line: $end_line})",
-                name=class_name,
-                file=self.file_path,
-                line=line_num,
-                end_line=getattr(node, 'end_lineno', -1)
-            )
+            labels = ":Class"
+
+        self.session.run(
+            f"MERGE (c{labels}{self.extra_labels} {{name: $name, file: $file, line: $line, end_line: $end_line}})",
+            name=class_name,
+            file=self.file_path,
+            line=line_num,
+            end_line=getattr(node, 'end_lineno', -1)
+        )
 
         self.generic_visit(node)
         self.current_class = None
@@ -127,19 +164,14 @@ class CodeAnalyzer(ast.NodeVisitor):
         if self.current_class:
             labels += ":ClassFunction"
 
-        # Check if a reference node for this function already exists
-        result = self.session.run(
-            f"""
-            MATCH (f{labels} {{name: $name, is_reference: true}})
-            RETURN f
-            """,
-            name=function_name
-        ).data()
+        # Reference nodes only carry the plain :Function label, so only
+        # unlabelled definitions whose name was referenced can replace one
+        has_reference = labels == ":Function" and function_name in _reference_names
 
         # First create or update the function node
         self.session.run(
             f"""
-            MERGE (f{labels} {{
+            MERGE (f{labels}{self.extra_labels} {{
                 name: $name,
                 file: $file,
                 is_reference: false,
@@ -157,7 +189,7 @@ class CodeAnalyzer(ast.NodeVisitor):
 
         # If we previously created a reference node for this function by name only,
         # link any calls to the reference node to this defined function
-        if result:
+        if has_reference:
             self.session.run(
                 """
                 MATCH (ref:Function {name: $simple_name, is_reference: true})
@@ -173,22 +205,39 @@ class CodeAnalyzer(ast.NodeVisitor):
                 edge_color="#FF9800"  # Orange for calls relationships
             )
         if self.current_class:
+            self.contains.append({"class_name": self.current_class, "func_name": full_name})
+        self.generic_visit(node)
+        self.current_function = None
+        # Restore previous scope
+        self.current_scope = previous_scope
+
+    def visit_Module(self, node):
+        """Visit the whole module, then write everything buffered while visiting it."""
+        self.generic_visit(node)
+        self.flush()
+
+    def flush(self):
+        """
+        Write the constants and relationships buffered while visiting the file.
+        visit_Module calls this once the whole tree has been visited, so
+        callers only need it after visiting individual nodes directly.
+        """
+        if self.constants:
+            self._flush_constants()
+
+        if self.contains:
             self.session.run(
                 """
-                MATCH (c:Class {name: $class_name, file: $file})
-                WITH c
-                MATCH (f:Function {name: $func_name, file: $file})
+                UNWIND $rows AS row
+                MATCH (c:Class {name: row.class_name, file: $file})
+                MATCH (f:Function {name: row.func_name, file: $file})
                 MERGE (c)-[:CONTAINS {color: $edge_color}]->(f)
                 """,
-                class_name=self.current_class,
-                func_name=full_name,
+                rows=self.contains,
                 file=self.file_path,
                 edge_color="#9C27B0"  # Purple for contains relationships
             )
-        self.generic_visit(node)
-        self.current_function = None
-        # Restore previous scope
-        self.current_scope = previous_scope
+            self.contains = []
 
     def visit_Assign(self, node):
         """
@@ -232,8 +281,8 @@ class CodeAnalyzer(ast.NodeVisitor):
                     elif container_type == "function":
                         container_name = self.current_function
 
-                    # Create the constant node
-                    self._create_constant_node(name, value, value_type, line_num, end_line_num, container_type, container_name)
+                    # Buffer the constant node; flush() writes it
+                    self._buffer_constant(name, value, value_type, line_num, end_line_num, container_type, container_name)
 
         self.generic_visit(node)
 
@@ -288,9 +337,9 @@ class CodeAnalyzer(ast.NodeVisitor):
             # For other types or complex expressions, return a simplified representation
             return str(ast.dump(value_node)), "expression"
 
-    def _create_constant_node(self, name, value, value_type, line_num, end_line_num, container_type, container_name=None):
+    def _buffer_constant(self, name, value, value_type, line_num, end_line_num, container_type, container_name=None):
         """
-        Create a Constant node in the Neo4j database and link it to its container.
+        Buffer a Constant node and the link to its container for flush().
 
         Args:
             name: Name of the constant
@@ -301,63 +350,70 @@ class CodeAnalyzer(ast.NodeVisitor):
             container_type: Type of container (module, class, function)
             container_name: Name of the container (if applicable)
         """
-        # Create the constant node
-        constant_node = self.session.run(
-            """
-            MERGE (c:Constant {
-                name: $name,
-                value: $value,
-                type: $type,
+        self.constants.append({
+            "name": name,
+            "value": value,
+            "type": value_type,
+            "line": line_num,
+            "end_line": end_line_num,
+            "scope": container_type,
+            "container_name": container_name
+        })
+
+    def _flush_constants(self):
+        """Write all buffered Constant nodes and their DEFINES relationships."""
+        # Create the constant nodes
+        self.session.run(
+            f"""
+            UNWIND $rows AS row
+            MERGE (c:Constant{self.extra_labels} {{
+                name: row.name,
+                value: row.value,
+                type: row.type,
                 file: $file,
-                line: $line,
-                end_line: $end_line,
-                scope: $scope
-            })
-            RETURN c
+                line: row.line,
+                end_line: row.end_line,
+                scope: row.scope
+            }})
             """,
-            name=name,
-            value=value,
-            type=value_type,
-            file=self.file_path,
-            line=line_num,
-            end_line=end_line_num,
-            scope=container_type
-        ).single()
-
-        # Create relationship to container
-        if container_type == "module":
-            # For module-level constants, there's no specific container node
-            # We could create a File node if needed, but for now we just leave it
-            pass
-        elif container_type == "class" and container_name:
-            # Link to class
+            rows=self.constants,
+            file=self.file_path
+        )
+
+        # Module-level constants have no container node; File links are made by analyze_file
+        class_rows = [row for row in self.constants if row["scope"] == "class" and row["container_name"]]
+        function_rows = [row for row in self.constants if row["scope"] == "function" and row["container_name"]]
+
+        if class_rows:
+            # Link to classes
             self.session.run(
                 """
-                MATCH (constant:Constant {name: $constant_name, file: $file, line: $line})
-                MATCH (class:Class {name: $class_name, file: $file})
+                UNWIND $rows AS row
+                MATCH (constant:Constant {name: row.name, file: $file, line: row.line})
+                MATCH (class:Class {name: row.container_name, file: $file})
                 MERGE (class)-[:DEFINES {color: $edge_color}]->(constant)
                 """,
-                constant_name=name,
-                class_name=container_name,
+                rows=class_rows,
                 file=self.file_path,
-                line=line_num,
                 edge_color="#E91E63"  # Pink for defines relationships
             )
-        elif container_type == "function" and container_name:
-            # Link to function
+
+        if function_rows:
+            # Link to functions
             self.session.run(
                 """
-                MATCH (constant:Constant {name: $constant_name, file: $file, line: $line})
-                MATCH (function:Function {name: $function_name, file: $file})
+                UNWIND $rows AS row
+                MATCH (constant:Constant {name: row.name, file: $file, line: row.line})
+                MATCH (function:Function {name: row.container_name, file: $file})
                 MERGE (function)-[:DEFINES {color: $edge_color}]->(constant)
                 """,
-                constant_name=name,
-                function_name=container_name,
+                rows=function_rows,
                 file=self.file_path,
-                line=line_num,
                 edge_color="#E91E63"  # Pink for defines relationships
             )
 
+        self.constants = []
+
     def visit_Call(self, node):
         module_name = None
         # Get line number information for the call
@@ -381,7 +437,8 @@ class CodeAnalyzer(ast.NodeVisitor):
             elif isinstance(arg, ast.Constant):
                 arg_names.append(repr(arg.value))
             else:
-                arg_names.append(ast.dump(arg))
+                # Only record the expression type, not the whole subtree
+                arg_names.append(f"<{type(arg).__name__}>")
         args_str = ', '.join(arg_names)
 
         # Skip built-in functions and standard library calls
@@ -433,11 +490,11 @@ class CodeAnalyzer(ast.NodeVisitor):
             else:
                 # Function not yet defined anywhere we've seen, create a reference node
                 self.session.run(
-                    """
-                    MERGE (called:Function:ReferenceFunction {name: $called_name, is_reference: true, file: $file, line: $line, end_line: $end_line, length: 0})
+                    f"""
+                    MERGE (called:Function:ReferenceFunction{self.extra_labels} {{name: $called_name, is_reference: true, file: $file, line: $line, end_line: $end_line, length: 0}})
                     WITH called
-                    MATCH (caller:Function {name: $caller_name, file: $file})
-                    MERGE (caller)-[:CALLS {line: $line, args: $args}]->(called)
+                    MATCH (caller:Function {{name: $caller_name, file: $file}})
+                    MERGE (caller)-[:CALLS {{line: $line, args: $args}}]->(called)
                     """,
                     called_name=called_func,
                     caller_name=self.current_function,
@@ -447,6 +504,8 @@ class CodeAnalyzer(ast.NodeVisitor):
                     args=args_str
                 )
 
+                _reference_names.add(called_func)
+
                 # Register reference function with stats collector
                 self.stats.register_function(
                     name=called_func,
@@ -474,11 +533,11 @@ class CodeAnalyzer(ast.NodeVisitor):
                 )
 
                 # Track imports for later analysis of test relationships
-                self.session.run("""
-                    MERGE (i:Import {name: $name, alias: $alias, file: $file})
+                self.session.run(f"""
+                    MERGE (i:Import{self.extra_labels} {{name: $name, alias: $alias, file: $file}})
                     WITH i
-                    MATCH (f:Function {name: $func_name, file: $file})
-                    MERGE (f)-[:IMPORTS {color: $edge_color}]->(i)
+                    MATCH (f:Function {{name: $func_name, file: $file}})
+                    MERGE (f)-[:IMPORTS {{color: $edge_color}}]->(i)
                 """, name=imported_name, alias=alias_name, file=self.file_path,
                     func_name=self.current_function, edge_color="#4CAF50")  # Green for imports
 
@@ -503,11 +562,11 @@ class CodeAnalyzer(ast.NodeVisitor):
                 )
 
                 # Track imports for later analysis of test relationships
-                self.session.run("""
-                    MERGE (i:Import {name: $name, module: $module, alias: $alias, file: $file})
+                self.session.run(f"""
+                    MERGE (i:Import{self.extra_labels} {{name: $name, module: $module, alias: $alias, file: $file}})
                     WITH i
-                    MATCH (f:Function {name: $func_name, file: $file})
-                    MERGE (f)-[:IMPORTS {color: $edge_color}]->(i)
+                    MATCH (f:Function {{name: $func_name, file: $file}})
+                    MERGE (f)-[:IMPORTS {{color: $edge_color}}]->(i)
                 """, name=imported_name, module=module, alias=alias_name,
                     file=self.file_path, func_name=self.current_function, edge_color="#4CAF50")
 
@@ -527,17 +586,16 @@ class CodeAnalyzer(ast.NodeVisitor):
         # Use custom patterns if provided, otherwise use defaults from constants
         function_prefixes = custom_patterns['test_funcs'] if custom_patterns and 'test_funcs' in custom_patterns else TEST_FUNCTION_PREFIXES
 
-        # Process based on configurable naming patterns
-        for prefix in function_prefixes:
-            prefix_len = len(prefix)
-            self.session.run("""
-                MATCH (test:TestFunction)
-                WHERE test.name STARTS WITH $prefix
-                WITH test, substring(test.name, $prefix_len) AS tested_name
-                MATCH (prod:Function)
-                WHERE NOT prod:TestFunction AND prod.name = tested_name
-                MERGE (test)-[:TESTS {method: 'naming_pattern', color: $edge_color}]->(prod)
-            """, prefix=prefix, prefix_len=prefix_len, edge_color="#3F51B5")  # Indigo for tests
+        # Process based on configurable naming patterns, all prefixes in one query
+        self.session.run("""
+            UNWIND $prefixes AS prefix
+            MATCH (test:TestFunction)
+            WHERE test.name STARTS WITH prefix
+            WITH test, substring(test.name, size(prefix)) AS tested_name
+            MATCH (prod:Function)
+            WHERE NOT prod:TestFunction AND prod.name = tested_name
+            MERGE (test)-[:TESTS {method: 'naming_pattern', color: $edge_color}]->(prod)
+        """, prefixes=list(function_prefixes), edge_color="#3F51B5")  # Indigo for tests
 
         # Process based on imports
         self.session.run("""
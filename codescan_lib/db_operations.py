@@ -2,19 +2,85 @@ import os
 from typing import Optional
 from tqdm import tqdm
 from neo4j import GraphDatabase
+from neo4j.exceptions import ClientError
 from .constants import NEO4J_HOST, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+from .analyzer import reset_reference_names
 
-def clear_database(session, quiet: bool = False):
+# Indexes backing the label + property lookups the analyzer and queries rely on
+INDEX_STATEMENTS = [
+    "CREATE INDEX function_name IF NOT EXISTS FOR (f:Function) ON (f.name)",
+    "CREATE INDEX class_name IF NOT EXISTS FOR (c:Class) ON (c.name)",
+    "CREATE INDEX constant_name IF NOT EXISTS FOR (c:Constant) ON (c.name)",
+    "CREATE INDEX file_path IF NOT EXISTS FOR (f:File) ON (f.path)",
+]
+
+def _delete_batch(tx, batch_size: int) -> int:
+    """Delete up to batch_size nodes and return how many were removed."""
+    record = tx.run(
+        "MATCH (n) WITH n LIMIT $limit DETACH DELETE n RETURN count(*) AS deleted",
+        limit=batch_size
+    ).single()
+    return record["deleted"]
+
+# Status codes meaning the server cannot run CALL { ... } IN TRANSACTIONS;
+# servers older than Neo4j 4.4 reject the clause as a syntax error
+_BATCHING_UNSUPPORTED_CODES = frozenset({
+    "Neo.ClientError.Statement.SyntaxError",
+})
+
+def clear_database(session, quiet: bool = False, batch_size: int = 10000):
     """
     Clear all nodes and relationships in the database.
 
+    Nodes are deleted in batches so the transaction state stays bounded on
+    large graphs. Servers supporting CALL { ... } IN TRANSACTIONS (Neo4j 4.4+)
+    batch server-side; older servers fall back to a client-side loop.
+
     Args:
-        session: Neo4j database session
+        session: Neo4j database session. It must be a Session rather than a
+            transaction: IN TRANSACTIONS cannot run inside an explicit
+            transaction, and the fallback opens its own write transactions.
         quiet: Whether to suppress output
+        batch_size: Maximum number of nodes deleted per transaction
+
+    Raises:
+        TypeError: If session is not a Session
+        ClientError: For any client error other than missing IN TRANSACTIONS support
     """
+    if not hasattr(session, "execute_write"):
+        raise TypeError("clear_database needs a Neo4j Session, not a transaction")
+
     if not quiet:
         print("Clearing database...")
-    session.run("MATCH (n) DETACH DELETE n")
+
+    # Cached reference names are stale once their nodes are gone
+    reset_reference_names()
+
+    try:
+        session.run(
+            f"""
+            MATCH (n)
+            CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF {int(batch_size)} ROWS
+            """
+        ).consume()
+        return
+    except ClientError as e:
+        if e.code not in _BATCHING_UNSUPPORTED_CODES:
+            raise
+        # Server does not support batched subquery transactions
+
+    while session.execute_write(_delete_batch, batch_size) > 0:
+        pass
+
+def ensure_indexes(session):
+    """
+    Create the indexes used for node lookups if they don't exist yet.
+
+    Args:
+        session: Neo4j database session
+    """
+    for statement in INDEX_STATEMENTS:
+        session.run(statement).consume()
 
 def get_db_session():
     """Create and return a Neo4j database session."""
@@ -156,6 +156,8 @@ def function_call_arguments(fn: str, file: str = None) -> List[Dict[str, Any]]:
         file: (Optional) File path to disambiguate overloaded or class methods
     Returns:
         List of argument lists, with caller name, caller file, and call site line number.
+        Names and constants are listed as written; any other expression is
+        listed by its node type, e.g. "<BinOp>" or "<Call>".
     """
     cypher = """
         MATCH (caller:Function)-[call:CALLS]->(callee:Function {name:$fn})
@@ -1,6 +1,8 @@
 import os
+import re
 import sys
 import fnmatch
+import functools
 from .constants import IGNORE_DIRS, TEST_DIR_PATTERNS, TEST_FILE_PATTERNS
 
 def is_stdlib_module(module_name):
@@ -30,6 +32,60 @@ def is_example_file(file_path):
 
     return '/examples/' in normalized_path or 'examples/' in normalized_path or any(part == 'examples' for part in path_parts)
 
+@functools.lru_cache(maxsize=32)
+def _compile_file_patterns(patterns):
+    """
+    Split glob patterns into literal prefixes, suffixes and regex fallbacks.
+
+    Args:
+        patterns: Tuple of normalized glob patterns
+
+    Returns:
+        tuple: (prefixes, suffixes, affixes, regexes) where affixes are
+        (prefix, suffix) pairs for patterns with a single inner wildcard
+    """
+    prefixes, suffixes, affixes, regexes = [], [], [], []
+    for pattern in patterns:
+        if pattern.count('*') != 1 or any(c in pattern for c in '?['):
+            regexes.append(re.compile(fnmatch.translate(pattern)))
+            continue
+        head, tail = pattern.split('*')
+        if not tail:
+            prefixes.append(head)
+        elif not head:
+            suffixes.append(tail)
+        else:
+            affixes.append((head, tail))
+    return tuple(prefixes), tuple(suffixes), tuple(affixes), tuple(regexes)
+
+def _matches_file_patterns(filename, patterns):
+    """
+    Check whether a filename matches any of the given glob patterns.
+
+    Equivalent to fnmatch.fnmatch over each pattern, but simple prefix and
+    suffix globs are checked with str.startswith/str.endswith.
+
+    Args:
+        filename: Base name of the file
+        patterns: Iterable of glob patterns
+
+    Returns:
+        bool: True if any pattern matches
+    """
+    filename = os.path.normcase(filename)
+    prefixes, suffixes, affixes, regexes = _compile_file_patterns(
+        tuple(os.path.normcase(p) for p in patterns)
+    )
+    if prefixes and filename.startswith(prefixes):
+        return True
+    if suffixes and filename.endswith(suffixes):
+        return True
+    for head, tail in affixes:
+        if (len(filename) >= len(head) + len(tail)
+                and filename.startswith(head) and filename.endswith(tail)):
+            return True
+    return any(regex.match(filename) for regex in regexes)
+
 def is_test_file(file_path, custom_patterns=None):
     """
     Determine if a file is a test file based on configured patterns.
@@ -65,11 +121,7 @@ def is_test_file(file_path, custom_patterns=None):
 
     # Check if filename matches test file patterns
     filename = os.path.basename(file_path)
-    for pattern in file_patterns:
-        if fnmatch.fnmatch(filename, pattern):
-            return True
-
-    return False
+    return _matches_file_patterns(filename, file_patterns)
 
 def is_project_file(file_path, base_dir):
     """Check if a file is part of the project (not in standard library)."""
@@ -17,7 +17,7 @@ from codescan_lib import (
     IGNORE_DIRS,
 
     # Database operations
-    clear_database, get_db_session, close_db_connection, print_db_info,
+    clear_database, ensure_indexes, get_db_session, close_db_connection, print_db_info,
 
     # Analysis functions
     analyze_directory
@@ -96,6 +96,7 @@ def main():
     with driver.session() as session:
         # Clear the database to start fresh
         clear_database(session, quiet=quiet)
+        ensure_indexes(session)
 
         # Analyze the directory with custom patterns and collect stats
         stats = analyze_directory(
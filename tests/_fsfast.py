@@ -0,0 +1,34 @@
+"""
+Helpers for writing test fixture trees to disk.
+"""
+import os
+from pathlib import Path
+
+def write_tree(base, entries):
+    """
+    Write (relative path, bytes) entries under base.
+
+    Every directory an entry needs is created once, parents first; directories
+    that already exist are left as they are.
+
+    Args:
+        base: Directory to write the tree into; created if missing
+        entries: Iterable of (relative path, bytes content) tuples
+    """
+    entries = list(entries)
+    os.makedirs(base, exist_ok=True)
+
+    # Collect every directory below base that the entries need
+    dirs = set()
+    for rel_path, _ in entries:
+        parent = os.path.dirname(rel_path)
+        while parent and parent not in dirs:
+            dirs.add(parent)
+            parent = os.path.dirname(parent)
+
+    # Shorter paths first so parents exist before their children
+    for rel_dir in sorted(dirs, key=len):
+        os.makedirs(os.path.join(base, rel_dir), exist_ok=True)
+
+    for rel_path, content in entries:
+        Path(base, rel_path).write_bytes(content)
@@ -0,0 +1,24 @@
+"""
+Helpers shared by the test and example labeling tests.
+"""
+import copy
+import unittest
+from unittest.mock import Mock
+
+def without_body(node):
+    """Shallow copy of a class node with an empty body, so visiting it records only the class query."""
+    stripped = copy.copy(node)
+    stripped.body = []
+    return stripped
+
+class LabelingTestCase(unittest.TestCase):
+    """Base class whose tests get a session mock without any recorded calls."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._session_mock = Mock(spec=["run"])
+
+    def setUp(self):
+        self.session_mock = self._session_mock
+        self.session_mock.reset_mock()
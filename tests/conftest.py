@@ -0,0 +1,105 @@
+"""
+Shared pytest fixtures for tests that talk to Neo4j.
+
+When the suite runs under pytest-xdist (``pytest -n auto``) every worker gets
+its own Neo4j database so workers never see each other's nodes. The scanner
+resolves calls and test relationships by name across the whole graph, so
+workers cannot share one database; on a server without multi-database
+support (Community Edition) the Neo4j tests are skipped under xdist.
+"""
+import os
+import socket
+import uuid
+
+import pytest
+from neo4j import GraphDatabase
+from neo4j.exceptions import ClientError
+
+from codescan_lib.constants import NEO4J_HOST, NEO4J_PORT_BOLT, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+from codescan_lib.analyzer import reset_reference_names
+from codescan_lib.db_operations import clear_database, ensure_indexes
+
+@pytest.fixture(scope="session")
+def neo4j_reachable():
+    """Whether the Neo4j bolt port accepts connections, probed once with a short timeout."""
+    try:
+        socket.create_connection((NEO4J_HOST, int(NEO4J_PORT_BOLT)), timeout=0.25).close()
+    except OSError:
+        return False
+    return True
+
+@pytest.fixture(scope="session")
+def neo4j_driver(neo4j_reachable):
+    """Create one Neo4j driver for the whole test session."""
+    if not neo4j_reachable:
+        pytest.skip(f"Neo4j is not running at {NEO4J_HOST}:{NEO4J_PORT_BOLT}")
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    driver.verify_connectivity()
+    yield driver
+    driver.close()
+
+@pytest.fixture(scope="session")
+def neo4j_database(neo4j_driver):
+    """
+    Name of the database this test process uses.
+
+    Returns "neo4j" when not running under xdist, otherwise a per-worker
+    database that is created on first use. Naming the database explicitly
+    saves the driver a home database lookup for every new session.
+
+    Skips when a per-worker database cannot be created, which is the case
+    on Neo4j Community Edition.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker:
+        database = "neo4j"
+    else:
+        database = f"codescan-test-{worker}"
+        try:
+            with neo4j_driver.session(database="system") as session:
+                session.run(f"CREATE DATABASE `{database}` IF NOT EXISTS WAIT").consume()
+        except ClientError as e:
+            pytest.skip(
+                f"Could not create per-worker database '{database}' ({e.message}). "
+                "Parallel runs need a Neo4j server with multi-database support "
+                "(Enterprise Edition); run the suite without -n otherwise."
+            )
+
+    # Start from an empty, indexed graph once; individual tests only remove their own nodes
+    with neo4j_driver.session(database=database) as session:
+        clear_database(session, quiet=True)
+        ensure_indexes(session)
+    return database
+
+# Deletes only the node labels the scanner writes, in small batches
+FAST_RESET_QUERY = """
+    MATCH (n) WHERE n:File OR n:Function OR n:Class OR n:Import OR n:Constant
+    CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 1000 ROWS
+"""
+
+@pytest.fixture(scope="session")
+def fast_reset():
+    """
+    Cheaper stand-in for clear_database in tests.
+
+    Call it as fast_reset(session) to remove the nodes left by earlier
+    scans without sweeping the whole graph.
+    """
+    def reset(session):
+        session.run(FAST_RESET_QUERY).consume()
+        reset_reference_names()
+
+    return reset
+
+@pytest.fixture
+def neo4j_test_label():
+    """Unique label put on every node a single test creates."""
+    return f"T_{uuid.uuid4().hex}"
+
+@pytest.fixture
+def neo4j_test_session(neo4j_driver, neo4j_database, neo4j_test_label):
+    """Create a test session for Neo4j and delete the test's labelled nodes afterwards."""
+    with neo4j_driver.session(database=neo4j_database) as session:
+        yield session
+        session.run(f"MATCH (n:`{neo4j_test_label}`) DETACH DELETE n").consume()
+        reset_reference_names()
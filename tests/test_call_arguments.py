@@ -0,0 +1,24 @@
+import ast
+from unittest.mock import Mock
+
+from codescan_lib.analyzer import CodeAnalyzer
+
+def _recorded_args(call_src):
+    """Visit a single call made from inside a function and return the args recorded for it."""
+    session = Mock(spec=["run"])
+    # No definition of the called function is known yet
+    session.run.return_value.data.return_value = []
+    stats = Mock()
+    analyzer = CodeAnalyzer("/virtual/mod.py", session, stats_collector=stats)
+    analyzer.current_function = "caller"
+    analyzer.visit_Call(ast.parse(call_src).body[0].value)
+
+    calls = [c for c in stats.register_call.call_args_list if c.kwargs["callee"] == "f"]
+    assert len(calls) == 1
+    return calls[0].kwargs["args"].split(", ")
+
+def test_names_and_constants_kept():
+    assert _recorded_args("f(a, 1, 'x')") == ["a", "1", "'x'"]
+
+def test_expressions_recorded_by_node_type():
+    assert _recorded_args("f(a + 1, g())") == ["<BinOp>", "<Call>"]
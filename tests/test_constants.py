@@ -1,42 +1,32 @@
-import os
-import tempfile
-import shutil
-import pytest
-from neo4j import GraphDatabase
-
-from codescan_lib.analyzer import CodeAnalyzer
-from codescan_lib.db_operations import clear_database
 from codescan_lib.analysis import analyze_file, analyze_directory
-from codescan_lib.constants import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
 
-@pytest.fixture
-def neo4j_test_session():
-    """Create a test session for Neo4j."""
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    with driver.session() as session:
-        yield session
-    driver.close()
-
-def test_module_level_constant(neo4j_test_session):
+def test_module_level_constant(neo4j_test_session, neo4j_test_label, tmp_path):
     """Test that module-level constants are detected."""
     # Create a temporary file with a module-level constant
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "constants_mod.py")
-    with open(fpath, "w") as f:
-        f.write('MAXRETRIES = 3\n')  # Not a constant (no underscore)
-        f.write('MAX_RETRY_COUNT = 5\n')  # This is a constant
-
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
-
-    # Check if the constant was added to the database
-    result = neo4j_test_session.run(
-        "MATCH (c:Constant {name: 'MAX_RETRY_COUNT'}) RETURN c.value, c.type, c.scope"
-    ).single()
-
-    # Clean up
-    shutil.rmtree(d)
+    fpath = tmp_path / "constants_mod.py"
+    fpath.write_bytes(
+        b'MAXRETRIES = 3\n'  # Not a constant (no underscore)
+        b'MAX_RETRY_COUNT = 5\n'  # This is a constant
+    )
+
+    # Analyze the file
+    analyze_file(str(fpath), neo4j_test_session, str(tmp_path), extra_label=neo4j_test_label)
+
+    # Look up the constant and the non-constant in one read transaction
+    def verify(tx):
+        result = tx.run(
+            "MATCH (c:Constant {name: $name}) WHERE $label IN labels(c) RETURN c.value, c.type, c.scope",
+            name="MAX_RETRY_COUNT",
+            label=neo4j_test_label
+        ).single()
+        non_constant = tx.run(
+            "MATCH (c:Constant {name: $name}) WHERE $label IN labels(c) RETURN c",
+            name="MAXRETRIES",
+            label=neo4j_test_label
+        ).single()
+        return result, non_constant
+
+    result, non_constant = neo4j_test_session.execute_read(verify)
 
     # Verify results
     assert result is not None
@@ -45,44 +35,37 @@ def test_module_level_constant(neo4j_test_session):
     assert result["c.scope"] == "module"
 
     # Verify that non-constant was not added
-    non_constant = neo4j_test_session.run(
-        "MATCH (c:Constant {name: 'MAXRETRIES'}) RETURN c"
-    ).single()
     assert non_constant is None
 
-def test_class_level_constant(neo4j_test_session):
+def test_class_level_constant(neo4j_test_session, neo4j_test_label, tmp_path):
     """Test that class-level constants are detected."""
     # Create a temporary file with a class-level constant
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "constants_class.py")
-    with open(fpath, "w") as f:
-        f.write('''
+    fpath = tmp_path / "constants_class.py"
+    fpath.write_bytes(b'''
 class Config:
     DEBUG = True  # Not a constant (no underscore)
     DEFAULTTIMEOUT = 30  # Not a constant (no underscore)
     MAX_CONNECTION_RETRIES = 3  # This is a constant
 ''')
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
+    # Analyze the file
+    analyze_file(str(fpath), neo4j_test_session, str(tmp_path), extra_label=neo4j_test_label)
 
-    # Check if the constant was added to the database
+    # Fetch the constant, its defining class and any non-constants in one round-trip
     result = neo4j_test_session.run(
-        "MATCH (c:Constant {name: 'MAX_CONNECTION_RETRIES'}) RETURN c.value, c.type, c.scope"
-    ).single()
-
-    # Check relationship to class
-    relationship = neo4j_test_session.run(
-        """
-        MATCH (class:Class {name: 'Config'})-[:DEFINES]->(c:Constant {name: 'MAX_CONNECTION_RETRIES'})
-        RETURN class.name
         """
+        MATCH (c:Constant {name: $name}) WHERE $label IN labels(c)
+        OPTIONAL MATCH (class:Class {name: $class_name})-[:DEFINES]->(c) WHERE $label IN labels(class)
+        WITH c, class
+        OPTIONAL MATCH (n:Constant) WHERE n.name IN $non_constants AND $label IN labels(n)
+        RETURN c.value, c.type, c.scope, class.name, count(n) AS non_constants
+        """,
+        name="MAX_CONNECTION_RETRIES",
+        class_name="Config",
+        non_constants=["DEBUG", "DEFAULTTIMEOUT"],
+        label=neo4j_test_label
     ).single()
 
-    # Clean up
-    shutil.rmtree(d)
-
     # Verify results
     assert result is not None
     assert result["c.value"] == "3"
@@ -90,22 +73,16 @@ class Config:
     assert result["c.scope"] == "class"
 
     # Verify relationship
-    assert relationship is not None
-    assert relationship["class.name"] == "Config"
+    assert result["class.name"] == "Config"
 
     # Verify that non-constants were not added
-    non_constants = neo4j_test_session.run(
-        "MATCH (c:Constant) WHERE c.name IN ['DEBUG', 'DEFAULTTIMEOUT'] RETURN count(c) as count"
-    ).single()
-    assert non_constants["count"] == 0
+    assert result["non_constants"] == 0
 
-def test_function_level_constant(neo4j_test_session):
+def test_function_level_constant(neo4j_test_session, neo4j_test_label, tmp_path):
     """Test that function-level constants are detected."""
     # Create a temporary file with a function-level constant
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "constants_func.py")
-    with open(fpath, "w") as f:
-        f.write('''
+    fpath = tmp_path / "constants_func.py"
+    fpath.write_bytes(b'''
 def process_data():
     retry_count = 3  # Not a constant (lowercase)
     MAXITEMS = 30  # Not a constant (no underscore)
@@ -113,26 +90,24 @@ def process_data():
     return MAX_ITEMS_PER_PAGE
 ''')
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
+    # Analyze the file
+    analyze_file(str(fpath), neo4j_test_session, str(tmp_path), extra_label=neo4j_test_label)
 
-    # Check if the constant was added to the database
+    # Fetch the constant, its defining function and any non-constants in one round-trip
     result = neo4j_test_session.run(
-        "MATCH (c:Constant {name: 'MAX_ITEMS_PER_PAGE'}) RETURN c.value, c.type, c.scope"
-    ).single()
-
-    # Check relationship to function
-    relationship = neo4j_test_session.run(
-        """
-        MATCH (func:Function {name: 'process_data'})-[:DEFINES]->(c:Constant {name: 'MAX_ITEMS_PER_PAGE'})
-        RETURN func.name
         """
+        MATCH (c:Constant {name: $name}) WHERE $label IN labels(c)
+        OPTIONAL MATCH (func:Function {name: $func_name})-[:DEFINES]->(c) WHERE $label IN labels(func)
+        WITH c, func
+        OPTIONAL MATCH (n:Constant) WHERE n.name IN $non_constants AND $label IN labels(n)
+        RETURN c.value, c.type, c.scope, func.name, count(n) AS non_constants
+        """,
+        name="MAX_ITEMS_PER_PAGE",
+        func_name="process_data",
+        non_constants=["retry_count", "MAXITEMS"],
+        label=neo4j_test_label
     ).single()
 
-    # Clean up
-    shutil.rmtree(d)
-
     # Verify results
     assert result is not None
     assert result["c.value"] == "50"
@@ -140,22 +115,16 @@ def process_data():
     assert result["c.scope"] == "function"
 
     # Verify relationship
-    assert relationship is not None
-    assert relationship["func.name"] == "process_data"
+    assert result["func.name"] == "process_data"
 
     # Verify that non-constants were not added
-    non_constants = neo4j_test_session.run(
-        "MATCH (c:Constant) WHERE c.name IN ['retry_count', 'MAXITEMS'] RETURN count(c) as count"
-    ).single()
-    assert non_constants["count"] == 0
+    assert result["non_constants"] == 0
 
-def test_complex_constant_types(neo4j_test_session):
+def test_complex_constant_types(neo4j_test_session, neo4j_test_label, tmp_path):
     """Test that constants with complex types are correctly processed."""
     # Create a temporary file with constants of different types
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "constants_types.py")
-    with open(fpath, "w") as f:
-        f.write('''
+    fpath = tmp_path / "constants_types.py"
+    fpath.write_bytes(b'''
 # String constant
 DEFAULTMESSAGE = "Hello, World!"  # Not a constant (no underscore)
 ERROR_MESSAGE = "An error occurred"  # This is a constant
@@ -175,27 +144,29 @@ SCREENDIMENSIONS = (1920, 1080)  # Not a constant (no underscore)
 VALID_DIMENSIONS = (800, 600, 1024, 768)  # This is a constant
 ''')
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
+    # Analyze the file
+    analyze_file(str(fpath), neo4j_test_session, str(tmp_path), extra_label=neo4j_test_label)
 
-    # Check if constants were added to the database
-    results = neo4j_test_session.run(
+    # Fetch the constants and the non-constant count in one round-trip
+    record = neo4j_test_session.run(
         """
-        MATCH (c:Constant)
-        WHERE c.name IN ['ERROR_MESSAGE', 'ALLOWED_TYPES', 'HTTP_STATUS_CODES', 'VALID_DIMENSIONS']
-        RETURN c.name, c.value, c.type
-        """
-    ).data()
-
-    # Clean up
-    shutil.rmtree(d)
+        OPTIONAL MATCH (c:Constant)
+        WHERE c.name IN $names AND $label IN labels(c)
+        WITH collect({name: c.name, value: c.value, type: c.type}) AS results
+        OPTIONAL MATCH (n:Constant) WHERE n.name IN $non_constants AND $label IN labels(n)
+        RETURN results, count(n) AS non_constants
+        """,
+        names=["ERROR_MESSAGE", "ALLOWED_TYPES", "HTTP_STATUS_CODES", "VALID_DIMENSIONS"],
+        non_constants=["DEFAULTMESSAGE", "SCREENDIMENSIONS"],
+        label=neo4j_test_label
+    ).single()
+    results = record["results"]
 
     # Verify results
     assert len(results) == 4
 
     # Create a dictionary for easier assertion
-    constants = {r["c.name"]: (r["c.value"], r["c.type"]) for r in results}
+    constants = {r["name"]: (r["value"], r["type"]) for r in results}
 
     # Verify each constant
     assert "ERROR_MESSAGE" in constants
@@ -211,28 +182,22 @@ VALID_DIMENSIONS = (800, 600, 1024, 768)  # This is a constant
     assert constants["VALID_DIMENSIONS"][1] == "tuple"
 
     # Verify that non-constants were not added
-    non_constants = neo4j_test_session.run(
-        "MATCH (c:Constant) WHERE c.name IN ['DEFAULTMESSAGE', 'SCREENDIMENSIONS'] RETURN count(c) as count"
-    ).single()
-    assert non_constants["count"] == 0
+    assert record["non_constants"] == 0
 
-def test_repetitive_constants(neo4j_test_session):
+def test_repetitive_constants(neo4j_test_session, neo4j_test_label, tmp_path):
     """Test detection of repetitive constants."""
     # Create temporary files with the same constant values in different places
-    d = tempfile.mkdtemp()
 
     # File 1
-    fpath1 = os.path.join(d, "constants1.py")
-    with open(fpath1, "w") as f:
-        f.write('''
+    fpath1 = tmp_path / "constants1.py"
+    fpath1.write_bytes(b'''
 MAX_RETRY_COUNT = 3
 DEFAULT_TIMEOUT_MS = 5000
 ''')
 
     # File 2
-    fpath2 = os.path.join(d, "constants2.py")
-    with open(fpath2, "w") as f:
-        f.write('''
+    fpath2 = tmp_path / "constants2.py"
+    fpath2.write_bytes(b'''
 class Config:
     CONNECTIONRETRIES = 3  # Not a constant (no underscore)
     RETRYLIMIT = 3  # Not a constant (no underscore)
@@ -240,37 +205,27 @@ class Config:
 ''')
 
     # File 3
-    fpath3 = os.path.join(d, "constants3.py")
-    with open(fpath3, "w") as f:
-        f.write('''
+    fpath3 = tmp_path / "constants3.py"
+    fpath3.write_bytes(b'''
 def process():
     PROCESS_TIMEOUT_MS = 5000  # This is a constant
     return True
 ''')
 
-    # Clear database and analyze the directory
-    clear_database(neo4j_test_session)
-    analyze_directory(d, neo4j_test_session)
-
-    # Check for constants with the same value
-    same_value_3 = neo4j_test_session.run(
-        """
-        MATCH (c:Constant)
-        WHERE c.value = "3"
-        RETURN c.name
-        """
-    ).data()
+    # Analyze the directory
+    analyze_directory(str(tmp_path), neo4j_test_session, extra_label=neo4j_test_label)
 
-    same_value_5000 = neo4j_test_session.run(
-        """
-        MATCH (c:Constant)
-        WHERE c.value = "5000"
-        RETURN c.name
-        """
-    ).data()
+    # Check for constants with the same value in one read transaction
+    def verify(tx):
+        query = """
+            MATCH (c:Constant)
+            WHERE c.value = $value AND $label IN labels(c)
+            RETURN c.name
+            """
+        return (tx.run(query, value="3", label=neo4j_test_label).data(),
+                tx.run(query, value="5000", label=neo4j_test_label).data())
 
-    # Clean up
-    shutil.rmtree(d)
+    same_value_3, same_value_5000 = neo4j_test_session.execute_read(verify)
 
     # Verify results
     assert len(same_value_3) == 1
@@ -0,0 +1,68 @@
+from unittest.mock import Mock
+
+import pytest
+from neo4j.exceptions import ClientError
+
+from codescan_lib import clear_database
+
+
+class _CodedClientError(ClientError):
+    """ClientError carrying a fixed status code."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self._fixed_code = code
+
+    @property
+    def code(self):
+        return self._fixed_code
+
+
+def _mock_session():
+    return Mock(spec=["run", "execute_write"])
+
+
+def test_clear_database_batches_server_side():
+    session = _mock_session()
+    clear_database(session, quiet=True, batch_size=500)
+
+    session.run.assert_called_once()
+    query = session.run.call_args.args[0]
+    assert "IN TRANSACTIONS OF 500 ROWS" in query
+    session.run.return_value.consume.assert_called_once()
+    session.execute_write.assert_not_called()
+
+
+def test_clear_database_falls_back_without_batching_support():
+    session = _mock_session()
+    session.run.side_effect = _CodedClientError("Neo.ClientError.Statement.SyntaxError")
+    session.execute_write.side_effect = [3, 0]
+
+    clear_database(session, quiet=True, batch_size=3)
+
+    assert session.execute_write.call_count == 2
+    for call in session.execute_write.call_args_list:
+        assert call.args[1] == 3
+
+
+def test_clear_database_reraises_other_client_errors():
+    session = _mock_session()
+    session.run.side_effect = _CodedClientError("Neo.ClientError.Security.Forbidden")
+
+    with pytest.raises(ClientError):
+        clear_database(session, quiet=True)
+    session.execute_write.assert_not_called()
+
+
+def test_clear_database_rejects_transactions():
+    tx = Mock(spec=["run"])
+    with pytest.raises(TypeError):
+        clear_database(tx, quiet=True)
+    tx.run.assert_not_called()
+
+
+@pytest.mark.integration
+def test_clear_database(neo4j_test_session):
+    clear_database(neo4j_test_session)
+    result = neo4j_test_session.run("MATCH (n) RETURN count(n) AS cnt").single()
+    assert result["cnt"] == 0
@@ -1,29 +1,10 @@
-import os
-import tempfile
-import shutil
-import pytest
-from neo4j import GraphDatabase
-
-from codescan_lib.analyzer import CodeAnalyzer
-from codescan_lib.db_operations import clear_database
 from codescan_lib.analysis import analyze_file, analyze_directory
-from codescan_lib.constants import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
 
-@pytest.fixture
-def neo4j_test_session():
-    """Create a test session for Neo4j."""
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    with driver.session() as session:
-        yield session
-    driver.close()
-
-def test_file_node_creation(neo4j_test_session):
+def test_file_node_creation(neo4j_test_session, neo4j_test_label, tmp_path):
     """Test that File nodes are created for analyzed files."""
     # Create a temporary file with a class and function
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "test_file.py")
-    with open(fpath, "w") as f:
-        f.write('''
+    fpath = tmp_path / "test_file.py"
+    fpath.write_bytes(b'''
 class TestClass:
     def test_method(self):
         return "test"
@@ -32,93 +13,69 @@ def standalone_function():
     return "standalone"
 ''')
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
+    # Analyze the file
+    analyze_file(str(fpath), neo4j_test_session, str(tmp_path), extra_label=neo4j_test_label)
 
     # Get the relative path that should be used
-    rel_path = os.path.relpath(fpath, d)
-
-    # Check if a File node was created
-    file_node = neo4j_test_session.run(
-        "MATCH (f:File {path: $path}) RETURN f",
-        path=rel_path
-    ).single()
-
-    # Check if the File node is linked to the class
-    file_to_class = neo4j_test_session.run(
-        """
-        MATCH (f:File {path: $path})-[:CONTAINS]->(c:Class {name: 'TestClass'})
-        RETURN c
-        """,
-        path=rel_path
-    ).single()
-
-    # Check if the File node is linked to the standalone function
-    file_to_function = neo4j_test_session.run(
-        """
-        MATCH (f:File {path: $path})-[:CONTAINS]->(func:Function {name: 'standalone_function'})
-        RETURN func
-        """,
-        path=rel_path
-    ).single()
+    rel_path = str(fpath.relative_to(tmp_path))
 
-    # Check if the class is linked to its method
-    class_to_method = neo4j_test_session.run(
+    # Check the File node and its CONTAINS links in one round-trip
+    result = neo4j_test_session.run(
         """
-        MATCH (c:Class {name: 'TestClass'})-[:CONTAINS]->(m:Function {name: 'TestClass.test_method'})
-        RETURN m
+        OPTIONAL MATCH (f:File {path: $path}) WHERE $label IN labels(f)
+        RETURN f IS NOT NULL AS file_node,
+               EXISTS {
+                 MATCH (f)-[:CONTAINS]->(c:Class {name: $class_name}) WHERE $label IN labels(c)
+               } AS file_to_class,
+               EXISTS {
+                 MATCH (f)-[:CONTAINS]->(fn:Function {name: $func_name}) WHERE $label IN labels(fn)
+               } AS file_to_function,
+               EXISTS {
+                 MATCH (c:Class {name: $class_name})-[:CONTAINS]->(m:Function {name: $method_name})
+                 WHERE $label IN labels(c) AND $label IN labels(m)
+               } AS class_to_method
         """,
+        path=rel_path,
+        class_name="TestClass",
+        func_name="standalone_function",
+        method_name="TestClass.test_method",
+        label=neo4j_test_label
     ).single()
 
-    # Clean up
-    shutil.rmtree(d)
-
     # Verify results
-    assert file_node is not None, "File node was not created"
-    assert file_to_class is not None, "File node is not linked to the class"
-    assert file_to_function is not None, "File node is not linked to the standalone function"
-    assert class_to_method is not None, "Class is not linked to its method"
+    assert result["file_node"], "File node was not created"
+    assert result["file_to_class"], "File node is not linked to the class"
+    assert result["file_to_function"], "File node is not linked to the standalone function"
+    assert result["class_to_method"], "Class is not linked to its method"
 
-def test_file_type_labeling(neo4j_test_session):
+def test_file_type_labeling(neo4j_test_session, neo4j_test_label, tmp_path):
     """Test that File nodes have correct type labels."""
-    # Create a temporary directory with production and test files
-    d = tempfile.mkdtemp()
-
     # Create a production file
-    prod_path = os.path.join(d, "production.py")
-    with open(prod_path, "w") as f:
-        f.write('def production_function(): pass\n')
+    prod_path = tmp_path / "production.py"
+    prod_path.write_bytes(b'def production_function(): pass\n')
 
     # Create a test file
-    test_dir = os.path.join(d, "tests")
-    os.makedirs(test_dir)
-    test_path = os.path.join(test_dir, "test_module.py")
-    with open(test_path, "w") as f:
-        f.write('def test_function(): pass\n')
+    test_dir = tmp_path / "tests"
+    test_dir.mkdir()
+    test_path = test_dir / "test_module.py"
+    test_path.write_bytes(b'def test_function(): pass\n')
 
-    # Clear database and analyze the directory
-    clear_database(neo4j_test_session)
-    analyze_directory(d, neo4j_test_session)
+    # Analyze the directory
+    analyze_directory(str(tmp_path), neo4j_test_session, extra_label=neo4j_test_label)
 
     # Get relative paths
-    rel_prod_path = os.path.relpath(prod_path, d)
-    rel_test_path = os.path.relpath(test_path, d)
-
-    # Check if the production file has the correct label
-    prod_file = neo4j_test_session.run(
-        "MATCH (f:File {path: $path}) RETURN labels(f) AS labels",
-        path=rel_prod_path
-    ).single()
-
-    # Check if the test file has the TestFile label
-    test_file = neo4j_test_session.run(
-        "MATCH (f:File:TestFile {path: $path}) RETURN labels(f) AS labels",
-        path=rel_test_path
-    ).single()
-
-    # Clean up
-    shutil.rmtree(d)
+    rel_prod_path = str(prod_path.relative_to(tmp_path))
+    rel_test_path = str(test_path.relative_to(tmp_path))
+
+    # Fetch the labels of both files in one query
+    rows = neo4j_test_session.run(
+        "UNWIND $paths AS path MATCH (f:File {path: path}) WHERE $label IN labels(f) RETURN path, labels(f) AS labels",
+        paths=[rel_prod_path, rel_test_path],
+        label=neo4j_test_label
+    ).data()
+    labels_by_path = {row["path"]: row for row in rows}
+    prod_file = labels_by_path.get(rel_prod_path)
+    test_file = labels_by_path.get(rel_test_path)
 
     # Verify results
     assert prod_file is not None, "Production file node was not created"
@@ -128,13 +85,11 @@ def test_file_type_labeling(neo4j_test_session):
     assert test_file is not None, "Test file node was not created"
     assert 'TestFile' in test_file['labels'], "Test file missing TestFile label"
 
-def test_module_level_constants_linked_to_file(neo4j_test_session):
+def test_module_level_constants_linked_to_file(neo4j_test_session, neo4j_test_label, tmp_path):
     """Test that module-level constants are linked to the File node."""
     # Create a temporary file with module-level constants
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "constants_file.py")
-    with open(fpath, "w") as f:
-        f.write('''
+    fpath = tmp_path / "constants_file.py"
+    fpath.write_bytes(b'''
 MODULE_LEVEL_CONSTANT = "module_level"
 
 class TestClass:
@@ -145,24 +100,23 @@ class TestClass:
         return METHOD_LEVEL_CONSTANT
 ''')
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
+    # Analyze the file
+    analyze_file(str(fpath), neo4j_test_session, str(tmp_path), extra_label=neo4j_test_label)
 
     # Get the relative path
-    rel_path = os.path.relpath(fpath, d)
+    rel_path = str(fpath.relative_to(tmp_path))
 
     # Check if the module-level constant is linked to the File node
     file_to_constant = neo4j_test_session.run(
         """
-        MATCH (f:File {path: $path})-[:CONTAINS]->(c:Constant {name: 'MODULE_LEVEL_CONSTANT'})
+        MATCH (f:File {path: $path})-[:CONTAINS]->(c:Constant {name: $name})
+        WHERE $label IN labels(f) AND $label IN labels(c)
         RETURN c
         """,
-        path=rel_path
+        path=rel_path,
+        name="MODULE_LEVEL_CONSTANT",
+        label=neo4j_test_label
     ).single()
 
-    # Clean up
-    shutil.rmtree(d)
-
     # Verify results
     assert file_to_constant is not None, "Module-level constant is not linked to the File node"
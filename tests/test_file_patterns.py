@@ -0,0 +1,40 @@
+import os
+from fnmatch import fnmatch
+
+import pytest
+
+from codescan_lib.utils import _compile_file_patterns, _matches_file_patterns
+
+# Patterns exercising each fast path of _compile_file_patterns plus the regex fallback
+PATTERNS = [
+    ("*_test.py",),             # wildcard only at the start
+    ("test_*",),                # wildcard only at the end
+    ("*test*",),                # wildcard at both ends
+    ("test*.py",),              # single inner wildcard
+    ("test_?.py",),             # single-character wildcard
+    ("test_[abc].py",),         # character class
+    ("test_*", "*_test.py"),    # several patterns at once
+]
+
+NAMES = [
+    "test_a.py", "test_b.py", "test_d.py", "test_ab.py", "test_.py",
+    "foo_test.py", "_test.py", "test.py", "contest.pyc", "utils.py",
+    "Test_A.PY", "FOO_TEST.py", "tests",
+]
+
+@pytest.mark.parametrize("patterns", PATTERNS)
+@pytest.mark.parametrize("name", NAMES)
+def test_matches_like_fnmatch(name, patterns):
+    assert _matches_file_patterns(name, patterns) == any(fnmatch(name, p) for p in patterns)
+
+@pytest.mark.parametrize("pattern, bucket", [
+    ("*_test.py", 1),
+    ("test_*", 0),
+    ("test*.py", 2),
+    ("*test*", 3),
+    ("test_?.py", 3),
+    ("test_[abc].py", 3),
+])
+def test_compile_sorts_patterns(pattern, bucket):
+    compiled = _compile_file_patterns((os.path.normcase(pattern),))
+    assert [len(group) for group in compiled] == [int(i == bucket) for i in range(4)]
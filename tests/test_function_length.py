@@ -1,84 +1,52 @@
-import os
-import tempfile
-import shutil
-import pytest
-from neo4j import GraphDatabase
-
-from codescan_lib.analyzer import CodeAnalyzer
-from codescan_lib.db_operations import clear_database
-from codescan_lib.analysis import analyze_file
-from codescan_lib.constants import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
-
-@pytest.fixture
-def neo4j_test_session():
-    """Create a test session for Neo4j."""
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    with driver.session() as session:
-        yield session
-    driver.close()
-
-def test_single_line_function_length(neo4j_test_session):
+from codescan_lib.analysis import analyze_source
+
+# Sources are analyzed in memory, so the base directory never has to exist
+BASE_DIR = "/virtual"
+
+# Shared by the length lookups so Neo4j plans it once
+FUNCTION_LENGTH_QUERY = "MATCH (f:Function {name: $name}) WHERE $label IN labels(f) RETURN f.length as length"
+
+def test_single_line_function_length(neo4j_test_session, neo4j_test_label):
     """Test that single-line function length is calculated correctly."""
-    # Create a temporary file with a single-line function
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "single_line_func.py")
-    with open(fpath, "w") as f:
-        f.write('def single_line_function(): return "hello"\n')
+    # Source with a single-line function
+    source = 'def single_line_function(): return "hello"\n'
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
+    # Analyze the source
+    analyze_source(source, "single_line_func.py", neo4j_test_session, BASE_DIR, extra_label=neo4j_test_label)
 
     # Check if the function length was calculated correctly
-    result = neo4j_test_session.run(
-        "MATCH (f:Function {name: 'single_line_function'}) RETURN f.length as length"
-    ).single()
-
-    # Clean up
-    shutil.rmtree(d)
+    result = neo4j_test_session.run(FUNCTION_LENGTH_QUERY, name="single_line_function", label=neo4j_test_label).single()
 
     # Verify results
     assert result is not None
     assert result["length"] == 1  # Single-line function should have length 1
 
-def test_multi_line_function_length(neo4j_test_session):
+def test_multi_line_function_length(neo4j_test_session, neo4j_test_label):
     """Test that multi-line function length is calculated correctly."""
-    # Create a temporary file with a multi-line function
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "multi_line_func.py")
-    with open(fpath, "w") as f:
-        f.write('''
+    # Source with a multi-line function
+    source = '''
 def multi_line_function():
     # This is a comment
     x = 1
     y = 2
     z = x + y
     return z
-''')
+'''
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
+    # Analyze the source
+    analyze_source(source, "multi_line_func.py", neo4j_test_session, BASE_DIR, extra_label=neo4j_test_label)
 
     # Check if the function length was calculated correctly
-    result = neo4j_test_session.run(
-        "MATCH (f:Function {name: 'multi_line_function'}) RETURN f.length as length"
-    ).single()
-
-    # Clean up
-    shutil.rmtree(d)
+    result = neo4j_test_session.run(FUNCTION_LENGTH_QUERY, name="multi_line_function", label=neo4j_test_label).single()
 
     # Verify results
     assert result is not None
     assert result["length"] == 6  # Function spans 6 lines (from line 2 to line 7)
 
-def test_nested_function_length(neo4j_test_session):
+def test_nested_function_length(neo4j_test_session, neo4j_test_label):
     """Test that nested function lengths are calculated correctly."""
-    # Create a temporary file with nested functions
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "nested_func.py")
-    with open(fpath, "w") as f:
-        f.write('''
+    # Source with nested functions
+    source = '''
 def outer_function():
     x = 1
 
@@ -87,40 +55,25 @@ def outer_function():
         return y
 
     return inner_function() + x
-''')
+'''
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
+    # Analyze the source
+    analyze_source(source, "nested_func.py", neo4j_test_session, BASE_DIR, extra_label=neo4j_test_label)
 
-    # Check if the function lengths were calculated correctly
-    outer_result = neo4j_test_session.run(
-        "MATCH (f:Function {name: 'outer_function'}) RETURN f.length as length"
-    ).single()
-
-    # For inner functions, we need to check if they're in the database at all
-    inner_exists = neo4j_test_session.run(
-        "MATCH (f:Function) WHERE f.name CONTAINS 'inner_function' RETURN f.name, f.length"
-    ).data()
-
-    # Clean up
-    shutil.rmtree(d)
+    # Check if the outer function length was calculated correctly
+    outer_result = neo4j_test_session.run(FUNCTION_LENGTH_QUERY, name="outer_function", label=neo4j_test_label).single()
 
     # Verify results
     assert outer_result is not None
     assert outer_result["length"] == 8  # Outer function spans 8 lines (from line 2 to line 9)
 
-    # Note: The current implementation might not correctly handle inner functions
-    # This is a known limitation, so we just log it for now
-    print(f"Inner function data: {inner_exists}")
+    # Note: The current implementation might not correctly handle inner functions.
+    # This is a known limitation, so their lengths are not checked here
 
-def test_class_method_length(neo4j_test_session):
+def test_class_method_length(neo4j_test_session, neo4j_test_label):
     """Test that class method lengths are calculated correctly."""
-    # Create a temporary file with a class and methods
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "class_method.py")
-    with open(fpath, "w") as f:
-        f.write('''
+    # Source with a class and methods
+    source = '''
 class TestClass:
     def short_method(self):
         return "short"
@@ -130,23 +83,20 @@ class TestClass:
         y = 2
         z = x + y
         return z
-''')
+'''
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
-
-    # Check if the method lengths were calculated correctly
-    short_result = neo4j_test_session.run(
-        "MATCH (f:Function {name: 'TestClass.short_method'}) RETURN f.length as length"
-    ).single()
+    # Analyze the source
+    analyze_source(source, "class_method.py", neo4j_test_session, BASE_DIR, extra_label=neo4j_test_label)
 
-    long_result = neo4j_test_session.run(
-        "MATCH (f:Function {name: 'TestClass.longer_method'}) RETURN f.length as length"
-    ).single()
-
-    # Clean up
-    shutil.rmtree(d)
+    # Check if the method lengths were calculated correctly, in one query
+    rows = neo4j_test_session.run(
+        "UNWIND $names AS name MATCH (f:Function {name: name}) WHERE $label IN labels(f) RETURN name, f.length as length",
+        names=["TestClass.short_method", "TestClass.longer_method"],
+        label=neo4j_test_label
+    ).data()
+    lengths_by_name = {row["name"]: row for row in rows}
+    short_result = lengths_by_name.get("TestClass.short_method")
+    long_result = lengths_by_name.get("TestClass.longer_method")
 
     # Verify results
     assert short_result is not None
@@ -155,30 +105,25 @@ class TestClass:
     assert long_result is not None
     assert long_result["length"] == 5  # Longer method spans 5 lines
 
-def test_reference_function_length(neo4j_test_session):
+def test_reference_function_length(neo4j_test_session, neo4j_test_label):
     """Test that reference function lengths are set to 0."""
-    # Create a temporary file with a function that calls an undefined function
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "reference_func.py")
-    with open(fpath, "w") as f:
-        f.write('''
+    # Source with a function that calls an undefined function
+    source = '''
 def calling_function():
     # This calls an undefined function
     return undefined_function()
-''')
+'''
 
-    # Clear database and analyze the file
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, d)
+    # Analyze the source
+    analyze_source(source, "reference_func.py", neo4j_test_session, BASE_DIR, extra_label=neo4j_test_label)
 
     # Check if the reference function length is set to 0
     result = neo4j_test_session.run(
-        "MATCH (f:Function:ReferenceFunction {name: 'undefined_function'}) RETURN f.length as length"
+        "MATCH (f:Function:ReferenceFunction {name: $name}) WHERE $label IN labels(f) RETURN f.length as length",
+        name="undefined_function",
+        label=neo4j_test_label
     ).single()
 
-    # Clean up
-    shutil.rmtree(d)
-
     # Verify results
     assert result is not None
     assert result["length"] == 0  # Reference functions should have length 0
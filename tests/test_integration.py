@@ -1,35 +1,52 @@
-import os
-import tempfile
-import shutil
+import contextlib
 import pytest
-from neo4j import GraphDatabase
+import codescan_lib.analyzer
+import codescan_lib.constants
+import codescan_lib.utils
+from _fsfast import write_tree
 from codescan_lib import (
-    clear_database, analyze_directory,
+    analyze_directory_bulk,
     TEST_DIR_PATTERNS, TEST_FILE_PATTERNS, TEST_FUNCTION_PREFIXES, TEST_CLASS_PATTERNS
 )
 
-@pytest.fixture(scope="module")
-def neo4j_test_session():
-    uri = os.getenv("NEO4J_URI", "bolt://localhost:7600")
-    user = os.getenv("NEO4J_USER", "neo4j")
-    password = os.getenv("NEO4J_PASSWORD", "demodemo")
-    driver = GraphDatabase.driver(uri, auth=(user, password))
-    with driver.session() as session:
-        yield session
-    driver.close()
-
-class TestIntegration:
-    """Integration tests for test labeling and test coverage detection."""
-
-    def setup_standard_project(self, base_dir):
-        """Set up a standard project structure with tests in a tests directory."""
-        # Create the project structure
-        tests_dir = os.path.join(base_dir, "tests")
-        os.makedirs(tests_dir)
-
-        # Create production code file
-        with open(os.path.join(base_dir, "calculator.py"), "w") as f:
-            f.write("""
+pytestmark = pytest.mark.integration
+
+# Per-project count queries; $label is the label the test put on its nodes and is
+# passed as a parameter so the query text, and with it the cached plan, stays the same
+_Q_STANDARD_COUNTS = """
+    MATCH (tf:TestFunction) WHERE $label IN labels(tf)
+    WITH count(tf) AS test_functions
+    OPTIONAL MATCH (tf:TestFunction)-[r:TESTS]->() WHERE $label IN labels(tf)
+    WITH test_functions, count(r) AS tests_rels
+    RETURN test_functions, tests_rels,
+        EXISTS {
+            MATCH (tf:TestFunction)-[:TESTS]->(f:Function {name: $covered})
+            WHERE $label IN labels(tf) AND $label IN labels(f)
+        } AS covered,
+        EXISTS {
+            MATCH (tf:TestFunction)-[:TESTS]->(f:Function {name: $uncovered})
+            WHERE $label IN labels(tf) AND $label IN labels(f)
+        } AS uncovered
+"""
+
+_Q_MODULE_TESTS_COUNTS = """
+    MATCH (tf:TestFunction) WHERE $label IN labels(tf)
+    WITH count(tf) AS test_functions
+    OPTIONAL MATCH (tf:TestFunction)-[r:TESTS]->() WHERE $label IN labels(tf)
+    RETURN test_functions, count(r) AS tests_rels
+"""
+
+_Q_SPEC_COUNTS = """
+    MATCH (tf:TestFunction) WHERE $label IN labels(tf)
+    WITH count(tf) AS test_functions
+    OPTIONAL MATCH (tc:TestClass) WHERE $label IN labels(tc)
+    WITH test_functions, count(tc) AS test_classes
+    OPTIONAL MATCH (tf:TestFunction)-[r:TESTS]->() WHERE $label IN labels(tf)
+    RETURN test_functions, test_classes, count(r) AS tests_rels
+"""
+
+# Sample sources written by the project fixtures
+_CALCULATOR_PY = b"""
 def add(a, b):
     return a + b
 
@@ -38,11 +55,9 @@ def subtract(a, b):
 
 def multiply(a, b):
     return a * b
-""")
+"""
 
-        # Create test file
-        with open(os.path.join(tests_dir, "test_calculator.py"), "w") as f:
-            f.write("""
+_TEST_CALCULATOR_PY = b"""
 import calculator
 
 def test_add():
@@ -50,32 +65,9 @@ def test_add():
 
 def test_subtract():
     assert calculator.subtract(5, 3) == 2
-""")
-
-    def setup_module_tests_project(self, base_dir):
-        """Set up a project structure with tests within module directories."""
-        # Create the project structure
-        calc_dir = os.path.join(base_dir, "calculator")
-        os.makedirs(calc_dir)
-        calc_tests_dir = os.path.join(calc_dir, "tests")
-        os.makedirs(calc_tests_dir)
-
-        # Create production code file
-        with open(os.path.join(calc_dir, "operations.py"), "w") as f:
-            f.write("""
-def add(a, b):
-    return a + b
+"""
 
-def subtract(a, b):
-    return a - b
-
-def multiply(a, b):
-    return a * b
-""")
-
-        # Create test file
-        with open(os.path.join(calc_tests_dir, "test_operations.py"), "w") as f:
-            f.write("""
+_TEST_OPERATIONS_PY = b"""
 from calculator.operations import add, subtract
 
 def test_add():
@@ -83,27 +75,17 @@ def test_add():
 
 def test_subtract():
     assert subtract(5, 3) == 2
-""")
-
-    def setup_spec_naming_project(self, base_dir):
-        """Set up a project with spec-style test naming (BDD style)."""
-        # Create the project structure
-        spec_dir = os.path.join(base_dir, "spec")
-        os.makedirs(spec_dir)
+"""
 
-        # Create production code file
-        with open(os.path.join(base_dir, "validator.py"), "w") as f:
-            f.write("""
+_VALIDATOR_PY = b"""
 def is_email_valid(email):
     return "@" in email and "." in email
 
 def is_password_strong(password):
     return len(password) >= 8 and any(c.isdigit() for c in password)
-""")
+"""
 
-        # Create spec file
-        with open(os.path.join(spec_dir, "validator_spec.py"), "w") as f:
-            f.write("""
+_VALIDATOR_SPEC_PY = b"""
 import validator
 
 class DescribeEmailValidator:
@@ -119,126 +101,112 @@ def describe_password_validator():
 
     def it_rejects_weak_passwords():
         assert not validator.is_password_strong("weak")
-""")
-
-        # Save the original configuration
-        self.orig_dir_patterns = TEST_DIR_PATTERNS.copy()
-        self.orig_file_patterns = TEST_FILE_PATTERNS.copy()
-        self.orig_function_prefixes = TEST_FUNCTION_PREFIXES.copy()
-        self.orig_class_patterns = TEST_CLASS_PATTERNS.copy()
-
-        # Update configuration for spec-style testing
-        TEST_DIR_PATTERNS.append("spec/")
-        TEST_FILE_PATTERNS.append("*_spec.py")
-        TEST_FUNCTION_PREFIXES.extend(["it_", "describe_"])
-        TEST_CLASS_PATTERNS.append("Describe*")
-
-    def restore_config(self):
-        """Restore the original scanner configuration."""
-        # Only restore if we've saved the original configuration
-        if hasattr(self, 'orig_dir_patterns'):
-            TEST_DIR_PATTERNS = self.orig_dir_patterns
-            TEST_FILE_PATTERNS = self.orig_file_patterns
-            TEST_FUNCTION_PREFIXES = self.orig_function_prefixes
-            TEST_CLASS_PATTERNS = self.orig_class_patterns
-
-    def test_standard_project_structure(self, neo4j_test_session):
+"""
+
+class TestIntegration:
+    """Integration tests for test labeling and test coverage detection."""
+
+    @staticmethod
+    def setup_standard_project(base_dir):
+        """Set up a standard project structure with tests in a tests directory."""
+        write_tree(base_dir, [
+            ("calculator.py", _CALCULATOR_PY),  # Production code file
+            ("tests/test_calculator.py", _TEST_CALCULATOR_PY),  # Test file
+        ])
+
+    @staticmethod
+    def setup_module_tests_project(base_dir):
+        """Set up a project structure with tests within module directories."""
+        write_tree(base_dir, [
+            ("calculator/operations.py", _CALCULATOR_PY),  # Production code file
+            ("calculator/tests/test_operations.py", _TEST_OPERATIONS_PY),  # Test file
+        ])
+
+    @staticmethod
+    def setup_spec_naming_project(base_dir):
+        """Set up a project with spec-style test naming (BDD style)."""
+        write_tree(base_dir, [
+            ("validator.py", _VALIDATOR_PY),  # Production code file
+            ("spec/validator_spec.py", _VALIDATOR_SPEC_PY),  # Spec file
+        ])
+
+    @staticmethod
+    @contextlib.contextmanager
+    def spec_config():
+        """Enable spec-style test detection; undone when the block exits."""
+        # Patch the names where the scanner reads them: utils and analyzer import
+        # the lists from constants, so rebinding codescan_lib.* alone has no effect
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(codescan_lib.utils, "TEST_DIR_PATTERNS", TEST_DIR_PATTERNS + ["spec/"])
+            mp.setattr(codescan_lib.utils, "TEST_FILE_PATTERNS", TEST_FILE_PATTERNS + ["*_spec.py"])
+            mp.setattr(codescan_lib.analyzer, "TEST_FUNCTION_PREFIXES", TEST_FUNCTION_PREFIXES + ["it_", "describe_"])
+            mp.setattr(codescan_lib.constants, "TEST_CLASS_PATTERNS", TEST_CLASS_PATTERNS + ["Describe*"])
+            yield
+
+    @staticmethod
+    def analyze(base_dir, session, label, fast_reset):
+        """
+        Analyze one project on an otherwise empty graph.
+
+        The scanner links calls and tests by function name across the whole
+        graph, so no other project's nodes may be present. Every node is
+        tagged with the test's label, which the session fixture deletes
+        afterwards.
+        """
+        fast_reset(session)
+        analyze_directory_bulk(str(base_dir), session, extra_label=label)
+
+    def test_standard_project_structure(self, neo4j_test_session, neo4j_test_label, fast_reset, tmp_path):
         """Test detection of test components in a standard project structure."""
-        # Create a temporary project directory
-        temp_dir = tempfile.mkdtemp()
-        try:
-            # Set up the project
-            self.setup_standard_project(temp_dir)
-
-            # Clear database and analyze the project
-            clear_database(neo4j_test_session)
-            analyze_directory(temp_dir, neo4j_test_session)
-
-            # Verify test functions were detected
-            result = neo4j_test_session.run(
-                "MATCH (f:TestFunction) RETURN count(f) AS count"
-            ).single()
-            assert result["count"] == 2, "Should detect 2 test functions"
-
-            # Verify TESTS relationships were created
-            result = neo4j_test_session.run(
-                "MATCH ()-[r:TESTS]->() RETURN count(r) AS count"
-            ).single()
-            assert result["count"] > 0, "Should create TESTS relationships"
-
-            # Verify test coverage for specific functions
-            result = neo4j_test_session.run(
-                "MATCH (:TestFunction)-[:TESTS]->(f:Function {name: 'add'}) RETURN count(f) AS count"
-            ).single()
-            assert result["count"] > 0, "Should detect test coverage for add function"
-
-            result = neo4j_test_session.run(
-                "MATCH (:TestFunction)-[:TESTS]->(f:Function {name: 'multiply'}) RETURN count(f) AS count"
-            ).single()
-            assert result["count"] == 0, "Should not have test coverage for multiply function"
-
-        finally:
-            # Clean up
-            shutil.rmtree(temp_dir)
-
-    def test_module_tests_structure(self, neo4j_test_session):
+        self.setup_standard_project(str(tmp_path))
+        self.analyze(tmp_path, neo4j_test_session, neo4j_test_label, fast_reset)
+
+        # Fetch all counts in one round-trip
+        result = neo4j_test_session.run(
+            _Q_STANDARD_COUNTS,
+            label=neo4j_test_label,
+            covered="add",
+            uncovered="multiply"
+        ).single()
+
+        # Verify test functions were detected
+        assert result["test_functions"] == 2, "Should detect 2 test functions"
+
+        # Verify TESTS relationships were created
+        assert result["tests_rels"] > 0, "Should create TESTS relationships"
+
+        # Verify test coverage for specific functions
+        assert result["covered"], "Should detect test coverage for add function"
+        assert not result["uncovered"], "Should not have test coverage for multiply function"
+
+    def test_module_tests_structure(self, neo4j_test_session, neo4j_test_label, fast_reset, tmp_path):
         """Test detection of test components in a module tests structure."""
-        # Create a temporary project directory
-        temp_dir = tempfile.mkdtemp()
-        try:
-            # Set up the project
-            self.setup_module_tests_project(temp_dir)
-
-            # Clear database and analyze the project
-            clear_database(neo4j_test_session)
-            analyze_directory(temp_dir, neo4j_test_session)
-
-            # Verify test functions were detected
-            result = neo4j_test_session.run(
-                "MATCH (f:TestFunction) RETURN count(f) AS count"
-            ).single()
-            assert result["count"] >= 2, "Should detect at least 2 test functions"
-
-            # Verify TESTS relationships were created
-            result = neo4j_test_session.run(
-                "MATCH ()-[r:TESTS]->() RETURN count(r) AS count"
-            ).single()
-            assert result["count"] > 0, "Should create TESTS relationships"
-
-        finally:
-            # Clean up
-            shutil.rmtree(temp_dir)
-
-    def test_spec_naming_convention(self, neo4j_test_session):
+        self.setup_module_tests_project(str(tmp_path))
+        self.analyze(tmp_path, neo4j_test_session, neo4j_test_label, fast_reset)
+
+        # Fetch all counts in one round-trip
+        result = neo4j_test_session.run(_Q_MODULE_TESTS_COUNTS, label=neo4j_test_label).single()
+
+        # Verify test functions were detected
+        assert result["test_functions"] >= 2, "Should detect at least 2 test functions"
+
+        # Verify TESTS relationships were created
+        assert result["tests_rels"] > 0, "Should create TESTS relationships"
+
+    def test_spec_naming_convention(self, neo4j_test_session, neo4j_test_label, fast_reset, tmp_path):
         """Test detection of test components with spec-style naming."""
-        # Create a temporary project directory
-        temp_dir = tempfile.mkdtemp()
-        try:
-            # Set up the project with spec naming
-            self.setup_spec_naming_project(temp_dir)
-
-            # Clear database and analyze the project
-            clear_database(neo4j_test_session)
-            analyze_directory(temp_dir, neo4j_test_session)
-
-            # Verify test functions and classes were detected
-            result = neo4j_test_session.run(
-                "MATCH (f:TestFunction) RETURN count(f) AS count"
-            ).single()
-            assert result["count"] >= 4, "Should detect at least 4 test functions"
-
-            result = neo4j_test_session.run(
-                "MATCH (c:TestClass) RETURN count(c) AS count"
-            ).single()
-            assert result["count"] >= 1, "Should detect at least 1 test class"
-
-            # Verify TESTS relationships were created
-            result = neo4j_test_session.run(
-                "MATCH ()-[r:TESTS]->() RETURN count(r) AS count"
-            ).single()
-            assert result["count"] > 0, "Should create TESTS relationships"
-
-        finally:
-            # Clean up
-            shutil.rmtree(temp_dir)
-            self.restore_config()
+        self.setup_spec_naming_project(str(tmp_path))
+
+        # Only this project is scanned with the spec-style patterns
+        with self.spec_config():
+            self.analyze(tmp_path, neo4j_test_session, neo4j_test_label, fast_reset)
+
+        # Fetch all counts in one round-trip
+        result = neo4j_test_session.run(_Q_SPEC_COUNTS, label=neo4j_test_label).single()
+
+        # Verify test functions and classes were detected
+        assert result["test_functions"] >= 4, "Should detect at least 4 test functions"
+        assert result["test_classes"] >= 1, "Should detect at least 1 test class"
+
+        # Verify TESTS relationships were created
+        assert result["tests_rels"] > 0, "Should create TESTS relationships"
@@ -3,95 +3,62 @@ Test the modular MCP server structure.
 """
 import importlib
 import inspect
+import sys
 import pytest
 
-def test_tool_imports():
-    """Test that all tools can be imported from their modules."""
-    # Core tools
-    from codescan_lib.mcp_tools.core import get_connection_status_tool, graph_summary, rescan_codebase
-
-    # File tools
-    from codescan_lib.mcp_tools.file_tools import (
-        list_files, file_contents, list_functions, list_classes
-    )
-
-    # Call graph tools
-    from codescan_lib.mcp_tools.call_graph import (
-        callees, callers, unresolved_references, uncalled_functions,
-        most_called_functions, most_calling_functions, recursive_functions,
-        functions_calling_references, function_call_arguments, transitive_calls
-    )
-
-    # Class tools
-    from codescan_lib.mcp_tools.class_tools import (
-        classes_with_no_methods, classes_with_most_methods
-    )
+# Modules the MCP server is split into
+_MODULES = (
+    "codescan_lib.mcp_tools",
+    "codescan_lib.mcp_tools.base",
+    "codescan_lib.mcp_tools.core",
+    "codescan_lib.mcp_tools.file_tools",
+    "codescan_lib.mcp_tools.call_graph",
+    "codescan_lib.mcp_tools.class_tools",
+    "codescan_lib.mcp_tools.constant_tools",
+    "codescan_lib.mcp_tools.test_tools",
+)
 
-    # Constant tools
-    from codescan_lib.mcp_tools.constant_tools import (
-        repetitive_constants, repetitive_constant_names
-    )
-
-    # Test tools
-    from codescan_lib.mcp_tools.test_tools import (
-        list_test_functions, list_example_functions, list_test_classes,
-        list_example_classes, get_test_files, get_example_files,
-        get_test_detection_config, untested_functions, get_test_coverage_ratio,
-        functions_tested_by, get_tests_for_function, untested_classes
-    )
+# Tools each module is expected to provide
+_TOOL_TABLE = (
+    ("codescan_lib.mcp_tools.core", (
+        "get_connection_status_tool", "graph_summary", "rescan_codebase",
+    )),
+    ("codescan_lib.mcp_tools.file_tools", (
+        "list_files", "file_contents", "list_functions", "list_classes",
+    )),
+    ("codescan_lib.mcp_tools.call_graph", (
+        "callees", "callers", "unresolved_references", "uncalled_functions",
+        "most_called_functions", "most_calling_functions", "recursive_functions",
+        "functions_calling_references", "function_call_arguments", "transitive_calls",
+    )),
+    ("codescan_lib.mcp_tools.class_tools", (
+        "classes_with_no_methods", "classes_with_most_methods",
+    )),
+    ("codescan_lib.mcp_tools.constant_tools", (
+        "repetitive_constants", "repetitive_constant_names",
+    )),
+    ("codescan_lib.mcp_tools.test_tools", (
+        "list_test_functions", "list_example_functions", "list_test_classes",
+        "list_example_classes", "get_test_files", "get_example_files",
+        "get_test_detection_config", "untested_functions", "get_test_coverage_ratio",
+        "functions_tested_by", "get_tests_for_function", "untested_classes",
+    )),
+)
 
+def test_tool_imports():
+    """Test that all tools can be imported from their modules."""
     # Import main MCP server - should import all tools
     import codescan_mcp_server
 
     # Verify all expected functions are callable
-    assert callable(get_connection_status_tool)
-    assert callable(graph_summary)
-    assert callable(rescan_codebase)
-    assert callable(list_files)
-    assert callable(file_contents)
-    assert callable(list_functions)
-    assert callable(list_classes)
-    assert callable(callees)
-    assert callable(callers)
-    assert callable(unresolved_references)
-    assert callable(uncalled_functions)
-    assert callable(most_called_functions)
-    assert callable(most_calling_functions)
-    assert callable(recursive_functions)
-    assert callable(functions_calling_references)
-    assert callable(function_call_arguments)
-    assert callable(transitive_calls)
-    assert callable(classes_with_no_methods)
-    assert callable(classes_with_most_methods)
-    assert callable(repetitive_constants)
-    assert callable(repetitive_constant_names)
-    assert callable(list_test_functions)
-    assert callable(list_example_functions)
-    assert callable(list_test_classes)
-    assert callable(list_example_classes)
-    assert callable(get_test_files)
-    assert callable(get_example_files)
-    assert callable(get_test_detection_config)
-    assert callable(untested_functions)
-    assert callable(get_test_coverage_ratio)
-    assert callable(functions_tested_by)
-    assert callable(get_tests_for_function)
-    assert callable(untested_classes)
+    for module_name, names in _TOOL_TABLE:
+        module = sys.modules.get(module_name) or importlib.import_module(module_name)
+        for name in names:
+            assert callable(getattr(module, name)), f"{module_name}.{name} is not callable"
 
 def test_module_structure():
     """Test that the module structure is organized as expected."""
-    # Make sure each module exists
-    modules = [
-        "codescan_lib.mcp_tools",
-        "codescan_lib.mcp_tools.base",
-        "codescan_lib.mcp_tools.core",
-        "codescan_lib.mcp_tools.file_tools",
-        "codescan_lib.mcp_tools.call_graph",
-        "codescan_lib.mcp_tools.class_tools",
-        "codescan_lib.mcp_tools.constant_tools",
-        "codescan_lib.mcp_tools.test_tools"
-    ]
-
-    for module_name in modules:
-        module = importlib.import_module(module_name)
+    # Make sure each module exists; already-imported modules come straight from sys.modules
+    for module_name in _MODULES:
+        module = sys.modules.get(module_name) or importlib.import_module(module_name)
         assert module is not None, f"Module {module_name} not found"
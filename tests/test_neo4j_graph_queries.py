@@ -7,11 +7,11 @@ import os
 import sys
 import logging
 import pytest
-from dotenv import load_dotenv
+from pathlib import Path
 from neo4j import GraphDatabase
 
 # Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 # Setup logging
 logging.basicConfig(
@@ -20,88 +20,107 @@ logging.basicConfig(
 )
 logger = logging.getLogger("test_neo4j_graph_queries")
 
-# Load environment variables
-load_dotenv(".env", override=True)
+# Load environment variables, unless the environment already provides them
+if "NEO4J_URI" not in os.environ:
+    from dotenv import load_dotenv
+    load_dotenv(".env", override=False)
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7600")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "strongpassword")
 
-def test_graph_summary():
-    """Test the graph summary query."""
+# Cypher used by the query tests
+_Q_GRAPH_SUMMARY = """
+    MATCH (n)
+    RETURN
+        count(n) as nodeCount,
+        size([x IN labels(n) WHERE x <> "Reference" | x]) as labelCount,
+        count(distinct labels(n)) as uniqueLabelCount
+    LIMIT 1
+"""
+
+_Q_FUNCTIONS = """
+    MATCH (f:Function)
+    RETURN f.name as name, f.file as file, f.line as line
+    LIMIT 10
+"""
+
+_Q_CALLS = """
+    MATCH (caller:Function)-[:CALLS]->(callee:Function)
+    RETURN caller.name as caller, callee.name as callee
+    LIMIT 10
+"""
+
+def _connect():
+    """Open a driver and a session on it, or return (None, None) if Neo4j is unreachable."""
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
     try:
-        with GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD)) as driver:
-            with driver.session() as session:
-                # Test graph summary query
-                result = session.run("""
-                    MATCH (n)
-                    RETURN
-                        count(n) as nodeCount,
-                        size([x IN labels(n) WHERE x <> "Reference" | x]) as labelCount,
-                        count(distinct labels(n)) as uniqueLabelCount
-                    LIMIT 1
-                """)
-                summary = result.single()
-
-                if summary and summary["nodeCount"] > 0:
-                    logger.info(f"Graph summary: {summary}")
-                    print(f"\nGraph contains {summary['nodeCount']} nodes with {summary['uniqueLabelCount']} unique labels")
-                    assert True, "Graph contains data"
-                else:
-                    logger.warning("No data in graph or connection failed")
-                    pytest.skip("No data in graph - skipping this test")
+        driver.verify_connectivity()
     except Exception as e:
         logger.warning(f"Neo4j connection failed: {str(e)}")
+        driver.close()
+        return None, None
+    return driver, driver.session()
+
+@pytest.fixture(scope="module")
+def session():
+    """One Neo4j session shared by every query test in this module."""
+    driver, session = _connect()
+    if driver is None:
         pytest.skip("Neo4j connection failed - skipping this test")
+    yield session
+    session.close()
+    driver.close()
+
+def test_graph_summary(session):
+    """Test the graph summary query."""
+    try:
+        # Test graph summary query
+        summary = session.execute_read(lambda tx: tx.run(_Q_GRAPH_SUMMARY).single())
+
+        if summary and summary["nodeCount"] > 0:
+            logger.info(f"Graph summary: {summary}")
+            print(f"\nGraph contains {summary['nodeCount']} nodes with {summary['uniqueLabelCount']} unique labels")
+            assert True, "Graph contains data"
+        else:
+            logger.warning("No data in graph or connection failed")
+            pytest.skip("No data in graph - skipping this test")
+    except Exception as e:
+        logger.warning(f"Neo4j query failed: {str(e)}")
+        pytest.skip("Neo4j query failed - skipping this test")
 
-def test_function_query():
+def test_function_query(session):
     """Test querying functions from the graph."""
     try:
-        with GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD)) as driver:
-            with driver.session() as session:
-                # Test function query
-                result = session.run("""
-                    MATCH (f:Function)
-                    RETURN f.name as name, f.file as file, f.line as line
-                    LIMIT 10
-                """)
-
-                functions = list(result)
-                if functions:
-                    print("\nFound functions:")
-                    for func in functions:
-                        print(f"  - {func['name']} ({func['file']}:{func['line']})")
-                    assert len(functions) > 0, "Functions found in the graph"
-                else:
-                    logger.warning("No functions found in graph or connection failed")
-                    pytest.skip("No functions found in graph - skipping test")
+        # Test function query
+        functions = session.execute_read(lambda tx: list(tx.run(_Q_FUNCTIONS)))
+        if functions:
+            print("\nFound functions:")
+            for func in functions:
+                print(f"  - {func['name']} ({func['file']}:{func['line']})")
+            assert len(functions) > 0, "Functions found in the graph"
+        else:
+            logger.warning("No functions found in graph or connection failed")
+            pytest.skip("No functions found in graph - skipping test")
     except Exception as e:
-        logger.warning(f"Neo4j connection failed: {str(e)}")
-        pytest.skip("Neo4j connection failed - skipping this test")
+        logger.warning(f"Neo4j query failed: {str(e)}")
+        pytest.skip("Neo4j query failed - skipping this test")
 
-def test_call_relationships():
+def test_call_relationships(session):
     """Test querying function call relationships."""
     try:
-        with GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD)) as driver:
-            with driver.session() as session:
-                # Test call relationship query
-                result = session.run("""
-                    MATCH (caller:Function)-[:CALLS]->(callee:Function)
-                    RETURN caller.name as caller, callee.name as callee
-                    LIMIT 10
-                """)
-
-                calls = list(result)
-                if calls:
-                    print("\nFound function calls:")
-                    for call in calls:
-                        print(f"  - {call['caller']} calls {call['callee']}")
-                    assert len(calls) > 0, "Call relationships found in the graph"
-                else:
-                    logger.warning("No call relationships found in graph or connection failed")
-                    pytest.skip("No call relationships found in graph - skipping test")
+        # Test call relationship query
+        calls = session.execute_read(lambda tx: list(tx.run(_Q_CALLS)))
+        if calls:
+            print("\nFound function calls:")
+            for call in calls:
+                print(f"  - {call['caller']} calls {call['callee']}")
+            assert len(calls) > 0, "Call relationships found in the graph"
+        else:
+            logger.warning("No call relationships found in graph or connection failed")
+            pytest.skip("No call relationships found in graph - skipping test")
     except Exception as e:
-        logger.warning(f"Neo4j connection failed: {str(e)}")
-        pytest.skip("Neo4j connection failed - skipping this test")
+        logger.warning(f"Neo4j query failed: {str(e)}")
+        pytest.skip("Neo4j query failed - skipping this test")
 
 def main():
     """Run all the tests."""
@@ -111,16 +130,25 @@ def main():
         ("Call Relationships", test_call_relationships)
     ]
 
+    driver, session = _connect()
+    if driver is None:
+        print("\n❌ Could not connect to Neo4j.")
+        return 1
+
     success = True
-    for name, test_func in tests:
-        print(f"\n=== Testing {name} ===")
-        try:
-            if not test_func():
+    try:
+        for name, test_func in tests:
+            print(f"\n=== Testing {name} ===")
+            try:
+                if not test_func(session):
+                    success = False
+                    logger.error(f"Test failed: {name}")
+            except Exception as e:
                 success = False
-                logger.error(f"Test failed: {name}")
-        except Exception as e:
-            success = False
-            logger.exception(f"Error during test {name}: {e}")
+                logger.exception(f"Error during test {name}: {e}")
+    finally:
+        session.close()
+        driver.close()
 
     if success:
         print("\n✅ All tests passed!")
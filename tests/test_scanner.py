@@ -1,26 +1,28 @@
 import os
-import tempfile
-import shutil
+import uuid
 import pytest
-from neo4j import GraphDatabase
-from codescan_lib import clear_database, analyze_file, analyze_directory
+from _fsfast import write_tree
+from codescan_lib import analyze_file, analyze_directory
+from codescan_lib.analyzer import reset_reference_names
 
-@pytest.fixture(scope="module")
-def neo4j_test_session():
-    uri = os.getenv("NEO4J_URI", "bolt://localhost:7600")
-    user = os.getenv("NEO4J_USER", "neo4j")
-    password = os.getenv("NEO4J_PASSWORD", "demodemo")
-    driver = GraphDatabase.driver(uri, auth=(user, password))
-    with driver.session() as session:
-        yield session
-    driver.close()
-
-@pytest.fixture
-def temp_pyfile():
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "testmod.py")
-    with open(fpath, "w") as f:
-        f.write("""
+pytestmark = pytest.mark.integration
+
+# Checks for the class, function and CONTAINS edge in one round trip;
+# $label is the label the sample's nodes carry
+NODES_AND_EDGES_QUERY = """
+    RETURN EXISTS { MATCH (c:Class {name:'A'}) WHERE $label IN labels(c) } AS hasClass,
+           EXISTS { MATCH (f:Function {name:'bar'}) WHERE $label IN labels(f) } AS hasFn,
+           EXISTS {
+               MATCH (c:Class)-[:CONTAINS]->(f:Function)
+               WHERE $label IN labels(c) AND $label IN labels(f)
+           } AS hasEdge
+"""
+
+# Looks up one of the sample's functions by name
+FUNCTION_QUERY = "MATCH (f:Function {name: $name}) WHERE $label IN labels(f) RETURN f"
+
+# Source of the sample module every read-only scanner test inspects
+_SAMPLE_SRC = b"""
 class A:
     def foo(self):
         pass
@@ -28,82 +30,99 @@ class A:
 def bar():
     print('hi')
     foo()
-""")
-    yield fpath, d
-    shutil.rmtree(d)
-
-def test_clear_database(neo4j_test_session):
-    clear_database(neo4j_test_session)
-    result = neo4j_test_session.run("MATCH (n) RETURN count(n) AS cnt").single()
-    assert result["cnt"] == 0
-
-def test_analyze_file_nodes_and_edges(neo4j_test_session, temp_pyfile):
-    fpath, basedir = temp_pyfile
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, basedir)
+"""
+
+@pytest.fixture(scope="module")
+def temp_pyfile_module(tmp_path_factory):
+    d = tmp_path_factory.mktemp("scanner")
+    write_tree(str(d), [("testmod.py", _SAMPLE_SRC)])
+    return str(d / "testmod.py"), str(d)
+
+@pytest.fixture(scope="module")
+def analyzed_sample(neo4j_driver, neo4j_database, fast_reset, temp_pyfile_module):
+    """
+    Scan the sample file once; the tests below only read the resulting graph.
+
+    The scan starts from an empty graph because calls are resolved by name
+    across the whole graph. Its nodes carry their own label, so the other
+    tests in this module leave them alone and the teardown removes only them.
+    """
+    fpath, basedir = temp_pyfile_module
+    label = f"T_{uuid.uuid4().hex}"
+    with neo4j_driver.session(database=neo4j_database) as session:
+        fast_reset(session)
+        analyze_file(fpath, session, basedir, extra_label=label)
+        yield session, label
+        session.run(f"MATCH (n:`{label}`) DETACH DELETE n").consume()
+        reset_reference_names()
+
+def test_analyze_file_nodes_and_edges(analyzed_sample):
+    session, label = analyzed_sample
+    res = session.run(NODES_AND_EDGES_QUERY, label=label).single()
     # Class node
-    res = neo4j_test_session.run("MATCH (c:Class {name:'A'}) RETURN c").single()
-    assert res is not None
+    assert res["hasClass"]
     # Function node
-    res = neo4j_test_session.run("MATCH (f:Function {name:'bar'}) RETURN f").single()
-    assert res is not None
+    assert res["hasFn"]
     # Contains edge
-    res = neo4j_test_session.run("MATCH (c:Class)-[:CONTAINS]->(f:Function) RETURN c,f").single()
-    assert res is not None
+    assert res["hasEdge"]
 
-def test_reference_function(neo4j_test_session, temp_pyfile):
-    fpath, basedir = temp_pyfile
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, basedir)
-    res = neo4j_test_session.run("MATCH (f:Function:ReferenceFunction {name:'foo'}) RETURN f").single()
+def test_reference_function(analyzed_sample):
+    session, label = analyzed_sample
+    res = session.run(
+        "MATCH (f:Function:ReferenceFunction {name: $name}) WHERE $label IN labels(f) RETURN f",
+        name="foo", label=label
+    ).single()
     assert res is not None
 
-def test_builtin_and_stdlib_skipped(neo4j_test_session, temp_pyfile):
-    fpath, basedir = temp_pyfile
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, basedir)
+def test_builtin_and_stdlib_skipped(analyzed_sample):
+    session, label = analyzed_sample
     # print is builtin, should not be a node
-    res = neo4j_test_session.run("MATCH (f:Function {name:'print'}) RETURN f").single()
+    res = session.run(FUNCTION_QUERY, name="print", label=label).single()
     assert res is None
 
-def test_relative_path_storage(neo4j_test_session, temp_pyfile):
-    fpath, basedir = temp_pyfile
-    clear_database(neo4j_test_session)
-    analyze_file(fpath, neo4j_test_session, basedir)
-    res = neo4j_test_session.run("MATCH (f:Function {name:'bar'}) RETURN f.file AS file").single()
+def test_relative_path_storage(analyzed_sample):
+    session, label = analyzed_sample
+    res = session.run(FUNCTION_QUERY, name="bar", label=label).single()
     assert res is not None
-    assert not os.path.isabs(res["file"])
+    assert not os.path.isabs(res["f"]["file"])
 
-def test_ignore_dirs(neo4j_test_session):
+def test_ignore_dirs(neo4j_test_session, neo4j_test_label, tmp_path):
     # Create a file in an ignored dir
-    d = tempfile.mkdtemp()
-    ignore_dir = os.path.join(d, "venv")
-    os.makedirs(ignore_dir)
-    fpath = os.path.join(ignore_dir, "foo.py")
-    with open(fpath, "w") as f:
-        f.write("def foo(): pass\n")
-    clear_database(neo4j_test_session)
-    analyze_directory(d, neo4j_test_session)
-    res = neo4j_test_session.run("MATCH (f:Function {name:'foo'}) RETURN f").single()
-    shutil.rmtree(d)
+    ignore_dir = tmp_path / "venv"
+    ignore_dir.mkdir()
+    (ignore_dir / "foo.py").write_text("def foo(): pass\n")
+    analyze_directory(str(tmp_path), neo4j_test_session, extra_label=neo4j_test_label)
+    res = neo4j_test_session.run(FUNCTION_QUERY, name="foo", label=neo4j_test_label).single()
     assert res is None
 
-def test_syntax_error_handling(neo4j_test_session):
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "bad.py")
-    with open(fpath, "w") as f:
-        f.write("def bad(:\n")
-    clear_database(neo4j_test_session)
+def test_syntax_error_handling(neo4j_test_session, neo4j_test_label, tmp_path):
+    fpath = tmp_path / "bad.py"
+    fpath.write_text("def bad(:\n")
     # Should not raise
-    analyze_file(fpath, neo4j_test_session, d)
-    shutil.rmtree(d)
-
-def test_unicode_decode_error_handling(neo4j_test_session):
-    d = tempfile.mkdtemp()
-    fpath = os.path.join(d, "bad.py")
-    with open(fpath, "wb") as f:
-        f.write(b"\xff\xfe\xfd\xfc\xfb\xfa")
-    clear_database(neo4j_test_session)
+    analyze_file(str(fpath), neo4j_test_session, str(tmp_path), extra_label=neo4j_test_label)
+
+def test_unicode_decode_error_handling(neo4j_test_session, neo4j_test_label, tmp_path):
+    fpath = tmp_path / "bad.py"
+    fpath.write_bytes(b"\xff\xfe\xfd\xfc\xfb\xfa")
     # Should not raise
-    analyze_file(fpath, neo4j_test_session, d)
-    shutil.rmtree(d)
+    analyze_file(str(fpath), neo4j_test_session, str(tmp_path), extra_label=neo4j_test_label)
+
+def test_reference_rewritten_for_later_definition(neo4j_test_session, neo4j_test_label, tmp_path):
+    write_tree(str(tmp_path), [
+        ("first/caller.py", b"def caller():\n    late_helper()\n"),
+        ("second/helper.py", b"def late_helper():\n    pass\n"),
+    ])
+    analyze_directory(str(tmp_path / "first"), neo4j_test_session, extra_label=neo4j_test_label)
+    # A new process starts without the reference names seen so far
+    reset_reference_names()
+    analyze_directory(str(tmp_path / "second"), neo4j_test_session, extra_label=neo4j_test_label)
+
+    res = neo4j_test_session.run(
+        """
+        MATCH (c:Function {name: 'caller'})-[:CALLS]->(f:Function {name: 'late_helper'})
+        WHERE $label IN labels(c)
+        RETURN f.is_reference AS is_reference
+        """,
+        label=neo4j_test_label
+    )
+    assert [record["is_reference"] for record in res] == [False]
@@ -1,30 +1,20 @@
 import os
-import sys
-import tempfile
-import shutil
-import unittest
 import ast
-from unittest.mock import MagicMock, patch
+from dataclasses import dataclass
+from unittest.mock import Mock, patch
 
-# Add parent directory to path to import scanner module
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
 
 # Import the module we'll be testing
 from codescan_lib.analyzer import CodeAnalyzer
 from codescan_lib.analysis import analyze_file
+from _fsfast import write_tree
 
-class TestCoverageDetection(unittest.TestCase):
-    """Test the test coverage detection functionality."""
-
-    def setUp(self):
-        """Set up the test environment."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.session_mock = MagicMock()
+# The analyzer only uses the path as a string, so it never has to exist
+BASE_DIR = "/virtual"
 
-        # Create a sample test file with imports and calls
-        self.test_file_path = os.path.join(self.temp_dir, "test_file.py")
-        with open(self.test_file_path, "w") as f:
-            f.write("""
+# Sample test file source; it is only parsed, never written to disk
+_TEST_FILE_SRC = b"""
 import codescan_lib  # Direct import
 from codescan_lib.analyzer import CodeAnalyzer  # Import from
 
@@ -35,73 +25,104 @@ class TestCodeAnalyzer:
 
 def test_analyze_file():
     codescan_lib.analyze_file("test.py", None, ".")
-""")
-
-        # Create a production file that will be "tested"
-        self.prod_file_path = os.path.join(self.temp_dir, "codescan_lib/analyzer.py")
-        os.makedirs(os.path.dirname(self.prod_file_path), exist_ok=True)
-        with open(self.prod_file_path, "w") as f:
-            f.write("""
-class CodeAnalyzer:
-    def visit_call(self, node):
-        pass
-""")
-
-        # Create a production file for analyze_file
-        self.analysis_file_path = os.path.join(self.temp_dir, "codescan_lib/analysis.py")
-        with open(self.analysis_file_path, "w") as f:
-            f.write("""
-def analyze_file(file_path, session, base_dir):
-    pass
-""")
+"""
 
-    def tearDown(self):
-        """Clean up the temporary directory."""
-        shutil.rmtree(self.temp_dir)
+# Written by the analyze_file test into its own directory
+_EXAMPLE_TEST_SRC = b"""
+import codescan_lib
+from codescan_lib.analyzer import CodeAnalyzer
 
-    def test_visit_import_tracking(self):
-        """Test that imports in test files are tracked correctly."""
-        # Parse the test file
-        with open(self.test_file_path, "r") as f:
-            tree = ast.parse(f.read(), filename=self.test_file_path)
+def test_something():
+    pass
+"""
+
+def _queries(mock):
+    """Cypher text of every session.run call recorded on the mock."""
+    return [c.args[0] for c in mock.run.call_args_list]
+
+def _query_names(mock):
+    """The $name parameter of every session.run call, or None where it has none."""
+    return [c.kwargs.get("name") for c in mock.run.call_args_list]
+
+@dataclass(frozen=True)
+class CoverageEnv:
+    """Sample test file shared by the coverage tests; none of the tests modify it."""
+    test_file_path: str
+    test_tree: ast.Module
+
+@pytest.fixture(scope="class")
+def env():
+    """Parse the sample test file a single time."""
+    test_file_path = os.path.join(BASE_DIR, "test_file.py")
+    return CoverageEnv(
+        test_file_path=test_file_path,
+        test_tree=ast.parse(_TEST_FILE_SRC, filename=test_file_path)
+    )
+
+@dataclass(frozen=True)
+class ImportNodes:
+    """First Import node per imported name and first ImportFrom node per module."""
+    imports: dict
+    froms: dict
+
+@pytest.fixture(scope="class")
+def import_nodes(env):
+    """Index the top-level import statements of the sample test file."""
+    imports, froms = {}, {}
+    for node in env.test_tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.setdefault(alias.name, node)
+        elif isinstance(node, ast.ImportFrom):
+            froms.setdefault(node.module, node)
+    return ImportNodes(imports=imports, froms=froms)
+
+@pytest.fixture(scope="class")
+def relationship_queries(env):
+    """Queries issued by one process_test_relationships() run on the sample test file."""
+    session_mock = Mock(spec=["run"])
+    analyzer = CodeAnalyzer(env.test_file_path, session_mock, is_test_file=True)
+    analyzer.process_test_relationships()
+    return tuple(_queries(session_mock))
+
+@pytest.fixture(scope="class")
+def shared_session_mock():
+    """Session mock shared by the tests of a class."""
+    return Mock(spec=["run"])
+
+@pytest.fixture
+def session_mock(shared_session_mock):
+    """The shared session mock, reset so each test starts without recorded calls."""
+    shared_session_mock.reset_mock()
+    return shared_session_mock
+
+class TestCoverageDetection:
+    """Test the test coverage detection functionality."""
 
+    def test_visit_import_tracking(self, env, import_nodes, session_mock):
+        """Test that imports in test files are tracked correctly."""
         # Create an analyzer with is_test_file=True
-        analyzer = CodeAnalyzer(self.test_file_path, self.session_mock, is_test_file=True)
+        analyzer = CodeAnalyzer(env.test_file_path, session_mock, is_test_file=True)
 
         # Find the Import node
-        import_node = None
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import) and any(alias.name == "codescan_lib" for alias in node.names):
-                import_node = node
-                break
+        import_node = import_nodes.imports.get("codescan_lib")
 
         # Call visit_Import with the node
         analyzer.visit_Import(import_node)
 
         # Verify the correct Cypher query was called to track the import
-        found_import_tracking = False
-        for call in self.session_mock.run.call_args_list:
-            if "MERGE (i:Import" in call[0][0] and "codescan_lib" in str(call):
-                found_import_tracking = True
-                break
+        queries, names = _queries(session_mock), _query_names(session_mock)
+        found_import_tracking = any("MERGE (i:Import" in q and n == "codescan_lib" for q, n in zip(queries, names))
 
-        self.assertTrue(found_import_tracking, "Import tracking not found in session calls")
+        assert found_import_tracking, "Import tracking not found in session calls"
 
-    def test_visit_importfrom_tracking(self):
+    def test_visit_importfrom_tracking(self, env, import_nodes, session_mock):
         """Test that import from statements in test files are tracked correctly."""
-        # Parse the test file
-        with open(self.test_file_path, "r") as f:
-            tree = ast.parse(f.read(), filename=self.test_file_path)
-
         # Create an analyzer with is_test_file=True
-        analyzer = CodeAnalyzer(self.test_file_path, self.session_mock, is_test_file=True)
+        analyzer = CodeAnalyzer(env.test_file_path, session_mock, is_test_file=True)
 
         # Find the ImportFrom node
-        importfrom_node = None
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ImportFrom) and node.module == "codescan_lib":
-                importfrom_node = node
-                break
+        importfrom_node = import_nodes.froms.get("codescan_lib")
 
         # Make sure we found an ImportFrom node
         if importfrom_node is None:
@@ -121,89 +142,34 @@ def analyze_file(file_path, session, base_dir):
         analyzer.visit_ImportFrom(importfrom_node)
 
         # Verify the correct Cypher query was called to track the import
-        found_import_tracking = False
-        for call in self.session_mock.run.call_args_list:
-            if "MERGE (i:Import" in call[0][0] and "CodeAnalyzer" in str(call):
-                found_import_tracking = True
-                break
-
-        self.assertTrue(found_import_tracking, "ImportFrom tracking not found in session calls")
+        queries, names = _queries(session_mock), _query_names(session_mock)
+        found_import_tracking = any("MERGE (i:Import" in q and n == "CodeAnalyzer" for q, n in zip(queries, names))
 
-    def test_process_test_relationships_naming(self):
-        """Test that test relationships are created based on naming patterns."""
-        # Create an analyzer with is_test_file=True
-        analyzer = CodeAnalyzer(self.test_file_path, self.session_mock, is_test_file=True)
-
-        # Call the method to create test relationships
-        analyzer.process_test_relationships()
+        assert found_import_tracking, "ImportFrom tracking not found in session calls"
 
-        # Verify the correct Cypher query was called to create naming-based relationships
-        found_naming_relationship = False
-        for call in self.session_mock.run.call_args_list:
-            if "MATCH (test:TestFunction)" in call[0][0] and "STARTS WITH" in call[0][0] and "MERGE (test)-[:TESTS" in call[0][0]:
-                found_naming_relationship = True
-                break
+    @pytest.mark.parametrize("needles", [
+        pytest.param(("MATCH (test:TestFunction)", "STARTS WITH", "MERGE (test)-[:TESTS"), id="naming"),
+        pytest.param(("MATCH (test:TestFunction)-[:IMPORTS]->(i:Import)", "MERGE (test)-[:TESTS"), id="imports"),
+        pytest.param(("MATCH (test:TestFunction)-[:CALLS]->(prod:Function)", "MERGE (test)-[:TESTS"), id="calls"),
+    ])
+    def test_process_test_relationships(self, relationship_queries, needles):
+        """Test that test relationships are created based on naming patterns, imports and calls."""
+        # Verify the Cypher query creating this kind of relationship was called
+        found_relationship = any(all(n in q for n in needles) for q in relationship_queries)
 
-        self.assertTrue(found_naming_relationship, "Naming-based test relationship creation not found")
-
-    def test_process_test_relationships_imports(self):
-        """Test that test relationships are created based on imports."""
-        # Create an analyzer with is_test_file=True
-        analyzer = CodeAnalyzer(self.test_file_path, self.session_mock, is_test_file=True)
+        assert found_relationship, f"Test relationship creation not found: {needles}"
 
-        # Call the method to create test relationships
-        analyzer.process_test_relationships()
-
-        # Verify the correct Cypher query was called to create import-based relationships
-        found_import_relationship = False
-        for call in self.session_mock.run.call_args_list:
-            if "MATCH (test:TestFunction)-[:IMPORTS]->(i:Import)" in call[0][0] and "MERGE (test)-[:TESTS" in call[0][0]:
-                found_import_relationship = True
-                break
-
-        self.assertTrue(found_import_relationship, "Import-based test relationship creation not found")
-
-    def test_process_test_relationships_calls(self):
-        """Test that test relationships are created based on calls."""
-        # Create an analyzer with is_test_file=True
-        analyzer = CodeAnalyzer(self.test_file_path, self.session_mock, is_test_file=True)
-
-        # Call the method to create test relationships
-        analyzer.process_test_relationships()
-
-        # Verify the correct Cypher query was called to create call-based relationships
-        found_call_relationship = False
-        for call in self.session_mock.run.call_args_list:
-            if "MATCH (test:TestFunction)-[:CALLS]->(prod:Function)" in call[0][0] and "MERGE (test)-[:TESTS" in call[0][0]:
-                found_call_relationship = True
-                break
-
-        self.assertTrue(found_call_relationship, "Call-based test relationship creation not found")
-
-    def test_analyze_file_calls_process_test_relationships(self):
+    def test_analyze_file_calls_process_test_relationships(self, session_mock, tmp_path):
         """Test that analyze_file calls process_test_relationships for test files."""
-        # Create a test file with a name that will definitely be detected as a test file
-        test_file_path = os.path.join(self.temp_dir, "tests/test_example.py")
-        os.makedirs(os.path.dirname(test_file_path), exist_ok=True)
-        with open(test_file_path, "w") as f:
-            f.write("""
-import codescan_lib
-from codescan_lib.analyzer import CodeAnalyzer
-
-def test_something():
-    pass
-""")
+        # Create a test file with a name that will definitely be detected as a test file;
+        # it goes into its own directory so the shared sample tree stays untouched
+        test_file_path = os.path.join(str(tmp_path), "tests/test_example.py")
+        write_tree(str(tmp_path), [("tests/test_example.py", _EXAMPLE_TEST_SRC)])
 
         # Create a direct spy on the process_test_relationships method
         with patch.object(CodeAnalyzer, 'process_test_relationships') as mock_process:
-            # Create a session mock
-            session_mock = MagicMock()
-
             # Call analyze_file with the test file
-            analyze_file(test_file_path, session_mock, self.temp_dir)
+            analyze_file(test_file_path, session_mock, str(tmp_path))
 
             # Verify process_test_relationships was called
             mock_process.assert_called_once()
-
-if __name__ == "__main__":
-    unittest.main()
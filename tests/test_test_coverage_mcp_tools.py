@@ -1,20 +1,22 @@
-import os
-import sys
 import unittest
 from unittest.mock import patch, MagicMock
 
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Import MCP tools to test
+from codescan_lib.mcp_tools.test_tools import (
+    untested_functions, get_test_coverage_ratio, functions_tested_by, get_tests_for_function
+)
 
 class TestCoverageMCPTools(unittest.TestCase):
     """Test the MCP tools for test coverage."""
 
+    def assertAllIn(self, query, *needles):
+        """Assert that every needle occurs in the query, reporting all missing ones at once."""
+        missing = [needle for needle in needles if needle not in query]
+        self.assertFalse(missing, f"Missing from query: {missing}")
+
     @patch('codescan_lib.mcp_tools.test_tools.q')
     def test_untested_functions(self, mock_q):
         """Test the untested_functions tool."""
-        # Import the function to test
-        from codescan_lib.mcp_tools.test_tools import untested_functions
-
         # Set up mock return value
         mock_q.return_value = [
             {"name": "untested_func1", "file": "scanner.py", "line": 10},
@@ -29,9 +31,12 @@ class TestCoverageMCPTools(unittest.TestCase):
         query = mock_q.call_args[0][0]
 
         # The query should be looking for functions that are not test functions and don't have a TESTS relationship
-        self.assertIn("MATCH (f:Function)", query)
-        self.assertIn("NOT f:TestFunction", query)
-        self.assertIn("NOT (:TestFunction)-[:TESTS]->(f)", query)
+        self.assertAllIn(
+            query,
+            "MATCH (f:Function)",
+            "NOT f:TestFunction",
+            "NOT (:TestFunction)-[:TESTS]->(f)",
+        )
 
         # Assert the result is what we expect
         self.assertEqual(len(result), 2)
@@ -41,9 +46,6 @@ class TestCoverageMCPTools(unittest.TestCase):
     @patch('codescan_lib.mcp_tools.test_tools.q')
     def test_test_coverage_ratio(self, mock_q):
         """Test the test_coverage_ratio tool."""
-        # Import the function to test
-        from codescan_lib.mcp_tools.test_tools import get_test_coverage_ratio
-
         # Set up mock return value
         mock_q.return_value = [
             {"total_functions": 10, "tested_functions": 7, "coverage_ratio": 0.7}
@@ -57,11 +59,14 @@ class TestCoverageMCPTools(unittest.TestCase):
         query = mock_q.call_args[0][0]
 
         # The query should calculate total functions, tested functions, and the ratio
-        self.assertIn("MATCH (f:Function) WHERE NOT f:TestFunction", query)
-        self.assertIn("count(f) AS total_functions", query)
-        self.assertIn("(:TestFunction)-[:TESTS]->(f)", query)
-        self.assertIn("count(f) AS tested_functions", query)
-        self.assertIn("toFloat(tested_functions) / total_functions", query)
+        self.assertAllIn(
+            query,
+            "MATCH (f:Function) WHERE NOT f:TestFunction",
+            "count(f) AS total_functions",
+            "(:TestFunction)-[:TESTS]->(f)",
+            "count(f) AS tested_functions",
+            "toFloat(tested_functions) / total_functions",
+        )
 
         # Assert the result is what we expect
         self.assertEqual(len(result), 1)
@@ -72,9 +77,6 @@ class TestCoverageMCPTools(unittest.TestCase):
     @patch('codescan_lib.mcp_tools.test_tools.q')
     def test_functions_tested_by(self, mock_q):
         """Test the functions_tested_by tool."""
-        # Import the function to test
-        from codescan_lib.mcp_tools.test_tools import functions_tested_by
-
         # Set up mock return value
         mock_q.return_value = [
             {"tested_name": "analyze_file", "tested_file": "scanner.py", "method": "naming_pattern"},
@@ -90,11 +92,14 @@ class TestCoverageMCPTools(unittest.TestCase):
         params = mock_q.call_args[1]
 
         # The query should find functions tested by the specified test file
-        self.assertIn("MATCH (test:TestFunction {file: $file})-[r:TESTS]->(f:Function)", query)
+        self.assertAllIn(
+            query,
+            "MATCH (test:TestFunction {file: $file})-[r:TESTS]->(f:Function)",
+            "f.name AS tested_name",
+            "f.file AS tested_file",
+            "r.method AS method",
+        )
         self.assertEqual(params.get("file"), "test_scanner.py")
-        self.assertIn("f.name AS tested_name", query)
-        self.assertIn("f.file AS tested_file", query)
-        self.assertIn("r.method AS method", query)
 
         # Assert the result is what we expect
         self.assertEqual(len(result), 2)
@@ -105,9 +110,6 @@ class TestCoverageMCPTools(unittest.TestCase):
     @patch('codescan_lib.mcp_tools.test_tools.q')
     def test_tests_for_function(self, mock_q):
         """Test the tests_for_function tool."""
-        # Import the function to test
-        from codescan_lib.mcp_tools.test_tools import get_tests_for_function
-
         # Set up mock return value
         mock_q.return_value = [
             {"test_name": "test_analyze_file", "test_file": "tests/test_scanner.py", "method": "naming_pattern"},
@@ -123,18 +125,18 @@ class TestCoverageMCPTools(unittest.TestCase):
         params = mock_q.call_args[1]
 
         # The query should find test functions that test the specified function
-        self.assertIn("MATCH (test:TestFunction)-[r:TESTS]->(f:Function {name: $name", query)
+        self.assertAllIn(
+            query,
+            "MATCH (test:TestFunction)-[r:TESTS]->(f:Function {name: $name",
+            "test.name AS test_name",
+            "test.file AS test_file",
+            "r.method AS method",
+        )
         self.assertEqual(params.get("name"), "analyze_file")
         self.assertEqual(params.get("file"), "scanner.py")
-        self.assertIn("test.name AS test_name", query)
-        self.assertIn("test.file AS test_file", query)
-        self.assertIn("r.method AS method", query)
 
         # Assert the result is what we expect
         self.assertEqual(len(result), 2)
         self.assertEqual(result[0]["test_name"], "test_analyze_file")
         self.assertEqual(result[1]["test_file"], "tests/test_scanner.py")
         self.assertEqual(result[0]["method"], "naming_pattern")
-
-if __name__ == "__main__":
-    unittest.main()
@@ -1,67 +1,68 @@
 import os
-import sys
 import logging
 import tempfile
-import shutil
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
-# Add parent directory to path to import scanner module
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
+from codescan_lib import utils
 from codescan_lib.utils import is_test_file
-from codescan_lib.constants import TEST_DIR_PATTERNS, TEST_FILE_PATTERNS
+from codescan_lib.constants import TEST_DIR_PATTERNS
+from _fsfast import write_tree
 
 class TestTestDetection(unittest.TestCase):
     """Test the test file detection functionality."""
 
-    def setUp(self):
-        """Set up a temporary directory structure for testing."""
-        self.temp_dir = tempfile.mkdtemp()
-
-        # Create a standard test directory structure
-        self.tests_dir = os.path.join(self.temp_dir, "tests")
-        os.makedirs(self.tests_dir)
+    @classmethod
+    def setUpClass(cls):
+        """Set up a temporary directory structure shared by all tests."""
+        cls._temp_ctx = tempfile.TemporaryDirectory()
+        cls.temp_dir = cls._temp_ctx.name
 
-        # Create a module with its own tests directory
-        self.module_dir = os.path.join(self.temp_dir, "module1")
-        self.module_tests_dir = os.path.join(self.module_dir, "tests")
-        os.makedirs(self.module_tests_dir)
+        # A standard tests directory plus a module with its own tests directory
+        cls.tests_dir = os.path.join(cls.temp_dir, "tests")
+        cls.module_dir = os.path.join(cls.temp_dir, "module1")
+        cls.module_tests_dir = os.path.join(cls.module_dir, "tests")
 
         # Create various test files
-        self.test_py_file = os.path.join(self.tests_dir, "test_example.py")
-        self.py_test_file = os.path.join(self.tests_dir, "example_test.py")
-        self.normal_file = os.path.join(self.temp_dir, "example.py")
-        self.module_test_file = os.path.join(self.module_tests_dir, "test_module.py")
-
-        # Create the files
-        for file_path in [self.test_py_file, self.py_test_file, self.normal_file, self.module_test_file]:
-            with open(file_path, "w") as f:
-                f.write("# Test file\n")
-
-    def tearDown(self):
+        cls.test_py_file = os.path.join(cls.tests_dir, "test_example.py")
+        cls.py_test_file = os.path.join(cls.tests_dir, "example_test.py")
+        cls.normal_file = os.path.join(cls.temp_dir, "example.py")
+        cls.module_test_file = os.path.join(cls.module_tests_dir, "test_module.py")
+        write_tree(cls.temp_dir, [
+            (os.path.relpath(file_path, cls.temp_dir), b"# Test file\n")
+            for file_path in (cls.test_py_file, cls.py_test_file, cls.normal_file, cls.module_test_file)
+        ])
+
+    @classmethod
+    def tearDownClass(cls):
         """Clean up the temporary directory."""
-        shutil.rmtree(self.temp_dir)
+        cls._temp_ctx.cleanup()
+
+    def make_scratch_dir(self):
+        """Private directory below the shared one for tests that write extra files."""
+        return tempfile.mkdtemp(dir=self.temp_dir)
 
     def test_test_directory_detection(self):
         """Test that files in test directories are detected."""
-        # Files in the main tests directory
-        self.assertTrue(is_test_file(self.test_py_file))
-        self.assertTrue(is_test_file(self.py_test_file))
-
-        # Files in nested test directories
-        self.assertTrue(is_test_file(self.module_test_file))
+        expected = {
+            # Files in the main tests directory
+            self.test_py_file: True,
+            self.py_test_file: True,
+            # Files in nested test directories
+            self.module_test_file: True,
+        }
+        self.assertEqual(expected, {path: is_test_file(path) for path in expected})
 
     def test_test_filename_detection(self):
         """Test that files with test naming patterns are detected."""
         # Create test files outside of test directories
-        test_file_outside = os.path.join(self.temp_dir, "test_outside.py")
-        test_file_suffix = os.path.join(self.temp_dir, "outside_test.py")
-
-        with open(test_file_outside, "w") as f:
-            f.write("# Test file outside test directory\n")
+        scratch_dir = self.make_scratch_dir()
+        test_file_outside = os.path.join(scratch_dir, "test_outside.py")
+        test_file_suffix = os.path.join(scratch_dir, "outside_test.py")
 
-        with open(test_file_suffix, "w") as f:
-            f.write("# Test file with suffix outside test directory\n")
+        Path(test_file_outside).write_bytes(b"# Test file outside test directory\n")
+        Path(test_file_suffix).write_bytes(b"# Test file with suffix outside test directory\n")
 
         # These should be detected based on filename patterns
         self.assertTrue(is_test_file(test_file_outside))
@@ -74,18 +75,15 @@ class TestTestDetection(unittest.TestCase):
     def test_example_file_detection(self):
         """Test that example files are not detected as test files."""
         # Create examples directory and files
-        examples_dir = os.path.join(self.temp_dir, "examples")
+        examples_dir = os.path.join(self.make_scratch_dir(), "examples")
         os.makedirs(examples_dir)
 
         # Different types of example files to test
         example_file = os.path.join(examples_dir, "example.py")
         example_test_file = os.path.join(examples_dir, "test_example.py")  # Test-like file in examples dir
 
-        with open(example_file, "w") as f:
-            f.write("# Example code\n")
-
-        with open(example_test_file, "w") as f:
-            f.write("# Example test code\n")
+        Path(example_file).write_bytes(b"# Example code\n")
+        Path(example_test_file).write_bytes(b"# Example test code\n")
 
         # Make sure none of the examples are detected as test files
         self.assertFalse(is_test_file(example_file), "Example file was incorrectly detected as a test file")
@@ -94,57 +92,34 @@ class TestTestDetection(unittest.TestCase):
     def test_custom_test_patterns(self):
         """Test with custom test directory and file patterns."""
         # Create a custom 'spec' directory
-        spec_dir = os.path.join(self.temp_dir, "spec")
+        spec_dir = os.path.join(self.make_scratch_dir(), "spec")
         os.makedirs(spec_dir)
         spec_file = os.path.join(spec_dir, "example_spec.py")
 
-        with open(spec_file, "w") as f:
-            f.write("# Spec file\n")
+        Path(spec_file).write_bytes(b"# Spec file\n")
 
-        # Temporarily override the test patterns
-        original_dir_patterns = TEST_DIR_PATTERNS.copy()
-        original_file_patterns = TEST_FILE_PATTERNS.copy()
+        # Use absolute path when testing, with forward slashes for consistent results
+        abs_spec_file = os.path.abspath(spec_file).replace("\\", "/")
 
-        try:
+        # Temporarily swap in other pattern lists. utils imports the lists from
+        # constants, so they are patched where it reads them.
+        with patch.object(utils, "TEST_DIR_PATTERNS", [*TEST_DIR_PATTERNS, "spec"]):
             # Add 'spec' to the test directory patterns
-            TEST_DIR_PATTERNS.append("spec")
-            # Use absolute path when testing
-            abs_spec_file = os.path.abspath(spec_file)
-
-            # Print for debugging
-            print(f"Testing path: {abs_spec_file}")
-            print(f"Current TEST_DIR_PATTERNS: {TEST_DIR_PATTERNS}")
-
-            # Force the normalized path to use forward slashes for consistent testing
-            result = is_test_file(abs_spec_file.replace("\\", "/"))
+            result = is_test_file(abs_spec_file)
             self.assertTrue(result, f"Expected {abs_spec_file} to be detected as a test file")
 
-            # Test with only custom patterns (removing standard ones)
-            TEST_DIR_PATTERNS.clear()
-            TEST_DIR_PATTERNS.append("spec")
-            TEST_FILE_PATTERNS.clear()
-            TEST_FILE_PATTERNS.append("*_spec.py")
-
+        # Test with only custom patterns (removing standard ones)
+        with patch.object(utils, "TEST_DIR_PATTERNS", ["spec"]), \
+             patch.object(utils, "TEST_FILE_PATTERNS", ["*_spec.py"]):
             # This should still be detected
-            result = is_test_file(abs_spec_file.replace("\\", "/"))
+            result = is_test_file(abs_spec_file)
             self.assertTrue(result)
 
-        finally:
-            # Restore original patterns
-            TEST_DIR_PATTERNS.clear()
-            TEST_DIR_PATTERNS.extend(original_dir_patterns)
-            TEST_FILE_PATTERNS.clear()
-            TEST_FILE_PATTERNS.extend(original_file_patterns)
-
     def test_relative_path_handling(self):
         """Test that relative paths are handled correctly."""
         # Convert to relative paths
         rel_test_file = os.path.relpath(self.test_py_file, os.getcwd())
         rel_normal_file = os.path.relpath(self.normal_file, os.getcwd())
 
-        self.assertTrue(is_test_file(rel_test_file))
-        self.assertFalse(is_test_file(rel_normal_file))
-
-
-if __name__ == "__main__":
-    unittest.main()
+        expected = {rel_test_file: True, rel_normal_file: False}
+        self.assertEqual(expected, {path: is_test_file(path) for path in expected})
@@ -1,14 +1,9 @@
-import os
-import sys
 import unittest
 from unittest.mock import patch, MagicMock
 
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 # Import MCP tools to test
 from codescan_lib.mcp_tools.test_tools import (
-    list_test_functions, list_test_classes, get_test_files
+    list_test_functions, list_test_classes, get_test_files, get_test_detection_config
 )
 
 class TestTestMCPTools(unittest.TestCase):
@@ -84,13 +79,11 @@ class TestTestMCPTools(unittest.TestCase):
     def test_test_detection_config(self):
         """Test the test_detection_config tool using a mock for the constants import."""
         # Mock the constants in codescan_lib
-        with patch('codescan_lib.constants.TEST_DIR_PATTERNS', ["tests/", "test/"]), \
-             patch('codescan_lib.constants.TEST_FILE_PATTERNS', ["test_*.py", "*_test.py"]), \
-             patch('codescan_lib.constants.TEST_FUNCTION_PREFIXES', ["test_"]), \
-             patch('codescan_lib.constants.TEST_CLASS_PATTERNS', ["Test*", "*Test"]):
-
-            # Import the function to test
-            from codescan_lib.mcp_tools.test_tools import get_test_detection_config
+        with patch.multiple('codescan_lib.constants',
+                            TEST_DIR_PATTERNS=["tests/", "test/"],
+                            TEST_FILE_PATTERNS=["test_*.py", "*_test.py"],
+                            TEST_FUNCTION_PREFIXES=["test_"],
+                            TEST_CLASS_PATTERNS=["Test*", "*Test"]):
 
             # Call the function
             result = get_test_detection_config()
@@ -100,7 +93,3 @@ class TestTestMCPTools(unittest.TestCase):
             self.assertEqual(result["test_file_patterns"], ["test_*.py", "*_test.py"])
             self.assertEqual(result["test_function_prefixes"], ["test_"])
             self.assertEqual(result["test_class_patterns"], ["Test*", "*Test"])
-
-
-if __name__ == "__main__":
-    unittest.main()